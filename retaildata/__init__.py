@@ -1,6 +1,6 @@
 """Public package interface for retaildata."""
 
-from retaildata.api import RetailDataAPI, api
+from retaildata.api import RetailDataAPI, api, aget, aload, get, get_many, list_datasets, load, purge, query
 
 __version__ = "0.1.5"
-__all__ = ["RetailDataAPI", "api"]
+__all__ = ["RetailDataAPI", "api", "aget", "aload", "get", "get_many", "list_datasets", "load", "purge", "query"]
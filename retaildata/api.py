@@ -1,8 +1,8 @@
+import inspect
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Union
 from retaildata.datasets.registry import Registry, Dataset
-from retaildata.providers.http import HTTPProvider
-from retaildata.providers.kaggle import KaggleProvider
 from retaildata.config import settings
 from rich import print as rprint
 
@@ -24,6 +24,18 @@ class RetailDataAPI:
         sample_fraction: Optional[float] = None,
         stratify_col: Optional[str] = None,
         split_fraction: Optional[float] = None,
+        streaming: bool = False,
+        workers: Optional[int] = None,
+        force_prepare: bool = False,
+        partition_by: Optional[List[str]] = None,
+        partition_date_col: Optional[str] = None,
+        row_group_size: Optional[int] = None,
+        statistics: Union[bool, str] = True,
+        seed: int = 0,
+        split_key: Optional[List[str]] = None,
+        compact: bool = False,
+        prepared_format: str = "parquet",
+        ipc_compression: str = "uncompressed",
         **kwargs
     ) -> Optional[Dict[str, Any]]:
         """
@@ -36,6 +48,18 @@ class RetailDataAPI:
             sample_fraction: Optional fraction for sampling (0.0 to 1.0).
             stratify_col: Optional column name for stratified sampling.
             split_fraction: Optional fraction for train/test splitting (e.g. 0.8).
+            streaming: If True, prepare CSV files out-of-core (lazy scan + sink to Parquet).
+            workers: Number of processes used to prepare files in parallel (0 = one per CPU).
+            force_prepare: If True, re-prepare files even if their raw checksum and options are unchanged.
+            partition_by: Optional columns to Hive-partition prepared tables by (e.g. ["store_nbr"]).
+            partition_date_col: Optional date column whose year and month become partition keys.
+            row_group_size: Optional Parquet row-group size (rows) for prepared files.
+            statistics: Parquet column statistics for prepared files: True, False or "full".
+            seed: Seed for sampling and splitting, so prepared outputs are reproducible.
+            split_key: Optional columns whose groups are kept on one side of the train/test split.
+            compact: If True, store low-cardinality strings as Enums and downcast numeric columns.
+            prepared_format: 'parquet', 'ipc' (Arrow IPC/Feather, memory-mapped on load) or 'both'.
+            ipc_compression: 'uncompressed' or 'lz4' for IPC files.
             **kwargs: Additional provider-specific arguments.
         """
         dataset = self.get_dataset(dataset_id)
@@ -48,52 +72,227 @@ class RetailDataAPI:
         meta_dir = target_dir / "meta"
         
         rprint(f"[bold blue]RetailData[/bold blue]: Downloading {dataset.id} to {download_path}")
+        self._provider(dataset).download(dataset, download_path, meta_dir=meta_dir, **kwargs)
+        rprint(f"[green]Successfully processed dataset '{dataset.id}'[/green]")
+        
+        if prepare:
+            self._prepare(
+                dataset,
+                target_dir,
+                sample_fraction=sample_fraction,
+                stratify_col=stratify_col,
+                split_fraction=split_fraction,
+                streaming=streaming,
+                workers=workers,
+                force_prepare=force_prepare,
+                partition_by=partition_by,
+                partition_date_col=partition_date_col,
+                row_group_size=row_group_size,
+                statistics=statistics,
+                seed=seed,
+                split_key=split_key,
+                compact=compact,
+                prepared_format=prepared_format,
+                ipc_compression=ipc_compression
+            )
+            return self.load(dataset.id, data_dir=target_dir, lazy=lazy)
+        
+        return None
 
+    def _provider(self, dataset: Dataset) -> Any:
+        """Instantiates the provider responsible for a dataset."""
+        # Providers (and their HTTP clients / SDKs) are imported only when needed
         if dataset.provider == "http":
-            provider = HTTPProvider()
-            provider.download(dataset, download_path, meta_dir=meta_dir, **kwargs)
+            from retaildata.providers.http import HTTPProvider
+            return HTTPProvider()
         elif dataset.provider == "kaggle":
-            provider = KaggleProvider()
-            provider.download(dataset, download_path, meta_dir=meta_dir, **kwargs)
+            from retaildata.providers.kaggle import KaggleProvider
+            return KaggleProvider()
         elif dataset.provider == "hf":
             from retaildata.providers.hf import HFProvider
-            provider = HFProvider()
-            provider.download(dataset, download_path, meta_dir=meta_dir, **kwargs)
+            return HFProvider()
         elif dataset.provider == "uci":
             from retaildata.providers.uci import UCIProvider
-            provider = UCIProvider()
-            provider.download(dataset, download_path, meta_dir=meta_dir, **kwargs)
+            return UCIProvider()
         elif dataset.provider == "openml":
             from retaildata.providers.openml import OpenMLProvider
-            provider = OpenMLProvider()
-            provider.download(dataset, download_path, meta_dir=meta_dir, **kwargs)
+            return OpenMLProvider()
         elif dataset.provider == "dlt":
             if dataset.id == "retail_express":
                 from retaildata.providers.retail_express import RetailExpressProvider
-                provider = RetailExpressProvider()
-            else:
-                from retaildata.providers.dlt import DLTProvider
-                provider = DLTProvider()
-            provider.download(dataset, download_path, meta_dir=meta_dir, **kwargs)
-        else:
-            raise NotImplementedError(f"Provider '{dataset.provider}' not yet supported.")
-            
+                return RetailExpressProvider()
+            from retaildata.providers.dlt import DLTProvider
+            return DLTProvider()
+        raise NotImplementedError(f"Provider '{dataset.provider}' not yet supported.")
+
+    def _prepare(
+        self,
+        dataset: Dataset,
+        target_dir: Path,
+        sample_fraction: Optional[float] = None,
+        stratify_col: Optional[str] = None,
+        split_fraction: Optional[float] = None,
+        streaming: bool = False,
+        workers: Optional[int] = None,
+        force_prepare: bool = False,
+        partition_by: Optional[List[str]] = None,
+        partition_date_col: Optional[str] = None,
+        row_group_size: Optional[int] = None,
+        statistics: Union[bool, str] = True,
+        seed: int = 0,
+        split_key: Optional[List[str]] = None,
+        compact: bool = False,
+        prepared_format: str = "parquet",
+        ipc_compression: str = "uncompressed"
+    ) -> Dict[str, Optional[str]]:
+        """Prepares a downloaded dataset and returns ``{file or table: error or None}``."""
+        from retaildata.processing.manager import manager as processing_manager
+        rprint(f"[bold blue]RetailData[/bold blue]: Preparing {dataset.id} (converting to Parquet)...")
+        results = processing_manager.prepare_dataset(
+            dataset.id, 
+            data_dir=target_dir,
+            sample_fraction=sample_fraction,
+            stratify_col=stratify_col,
+            split_fraction=split_fraction,
+            streaming=streaming,
+            workers=workers,
+            force=force_prepare,
+            partition_by=partition_by,
+            partition_date_col=partition_date_col,
+            row_group_size=row_group_size,
+            statistics=statistics,
+            seed=seed,
+            split_key=split_key,
+            compact=compact,
+            prepared_format=prepared_format,
+            ipc_compression=ipc_compression
+        )
+        return {r.name: r.error for r in results or []}
+
+    async def adownload(
+        self,
+        dataset_id: str,
+        data_dir: Optional[Path] = None,
+        prepare: bool = False,
+        lazy: bool = False,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Async ``download``; accepts the same arguments.
+
+        Multi-file HTTP datasets stream through ``httpx.AsyncClient``; single-file
+        (possibly segmented) HTTP downloads, blocking provider SDKs (Kaggle, HF,
+        UCI, OpenML, dlt) and the CPU-bound prepare run in worker threads. Many datasets can therefore be overlapped on one event loop, e.g.
+        ``await asyncio.gather(api.aget("m5"), api.aget("online_retail_ii"))``.
+        """
+        import asyncio
+        dataset = self.get_dataset(dataset_id)
+        if not dataset:
+            raise ValueError(f"Dataset '{dataset_id}' not found in registry.")
+
+        prepare_kwargs = {name: kwargs.pop(name) for name in list(kwargs) if name in _PREPARE_ARGS}
+        target_dir = data_dir or settings.final_data_dir
+        download_path = target_dir / "raw" / dataset.id
+        meta_dir = target_dir / "meta"
+
+        rprint(f"[bold blue]RetailData[/bold blue]: Downloading {dataset.id} to {download_path}")
+        await self._provider(dataset).adownload(dataset, download_path, meta_dir=meta_dir, **kwargs)
         rprint(f"[green]Successfully processed dataset '{dataset.id}'[/green]")
-        
+
         if prepare:
-            from retaildata.processing.manager import manager as processing_manager
-            rprint(f"[bold blue]RetailData[/bold blue]: Preparing {dataset.id} (converting to Parquet)...")
-            processing_manager.process_dataset(
-                dataset.id, 
-                data_dir=target_dir,
-                sample_fraction=sample_fraction,
-                stratify_col=stratify_col,
-                split_fraction=split_fraction
-            )
-            return self.load(dataset.id, data_dir=target_dir, lazy=lazy)
-        
+            await asyncio.to_thread(self._prepare, dataset, target_dir, **prepare_kwargs)
+            return await self.aload(dataset.id, data_dir=target_dir, lazy=lazy)
         return None
 
+    async def aget(
+        self,
+        dataset_id: str,
+        data_dir: Optional[Path] = None,
+        cache: bool = True,
+        prepare: bool = False,
+        **kwargs
+    ) -> Optional[Dict[str, Any]]:
+        """Async alias for ``adownload`` matching ``get``."""
+        return await self.adownload(dataset_id=dataset_id, data_dir=data_dir, cache=cache, prepare=prepare, **kwargs)
+
+    def get_many(
+        self,
+        dataset_ids: List[str],
+        data_dir: Optional[Path] = None,
+        prepare: bool = False,
+        jobs: int = 4,
+        prepare_jobs: int = 1,
+        provider_limits: Optional[Dict[str, int]] = None,
+        **kwargs
+    ) -> Dict[str, "GetResult"]:
+        """
+        Downloads (and optionally prepares) many datasets concurrently.
+
+        At most ``jobs`` downloads run at once, further capped per provider by
+        ``provider_limits`` (default ``settings.provider_concurrency``, e.g. Kaggle 2,
+        HTTP 8). Each dataset's prepare starts as soon as its own download finishes,
+        with at most ``prepare_jobs`` prepares at a time, so CPU work overlaps the
+        remaining downloads. A failing dataset is reported in its ``GetResult``
+        and does not abort the others. Other arguments are passed to every ``get``.
+        """
+        from retaildata.utils.parallel import run_coroutine
+        return run_coroutine(self.aget_many(
+            dataset_ids, data_dir=data_dir, prepare=prepare, jobs=jobs,
+            prepare_jobs=prepare_jobs, provider_limits=provider_limits, **kwargs
+        ))
+
+    async def aget_many(
+        self,
+        dataset_ids: List[str],
+        data_dir: Optional[Path] = None,
+        prepare: bool = False,
+        jobs: int = 4,
+        prepare_jobs: int = 1,
+        provider_limits: Optional[Dict[str, int]] = None,
+        **kwargs
+    ) -> Dict[str, "GetResult"]:
+        """Async ``get_many``."""
+        import asyncio
+        import time
+
+        limits = {**settings.provider_concurrency, **(provider_limits or {})}
+        prepare_kwargs = {name: kwargs.pop(name) for name in list(kwargs) if name in _PREPARE_ARGS}
+        download_slots = asyncio.Semaphore(max(jobs, 1))
+        prepare_slots = asyncio.Semaphore(max(prepare_jobs, 1))
+        provider_slots: Dict[str, asyncio.Semaphore] = {}
+        target_dir = data_dir or settings.final_data_dir
+
+        async def run(dataset_id: str) -> GetResult:
+            result = GetResult(dataset_id)
+            dataset = self.get_dataset(dataset_id)
+            if not dataset:
+                result.error = f"Dataset '{dataset_id}' not found in registry."
+                return result
+            provider_slot = provider_slots.setdefault(dataset.provider, asyncio.Semaphore(max(limits.get(dataset.provider, jobs), 1)))
+            try:
+                start = time.perf_counter()
+                async with provider_slot, download_slots:
+                    await self.adownload(dataset_id, data_dir=target_dir, **kwargs)
+                result.download_seconds = time.perf_counter() - start
+                if prepare:
+                    start = time.perf_counter()
+                    async with prepare_slots:
+                        files = await asyncio.to_thread(self._prepare, dataset, target_dir, **prepare_kwargs)
+                    result.prepare_errors = {name: error for name, error in files.items() if error is not None}
+                    result.prepared = bool(files) and not result.prepare_errors
+                    result.prepare_seconds = time.perf_counter() - start
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+            return result
+
+        results = await asyncio.gather(*(run(dataset_id) for dataset_id in dataset_ids))
+        return {r.dataset_id: r for r in results}
+
+    async def aload(self, dataset_id: str, **kwargs) -> Dict[str, Any]:
+        """Async ``load``; accepts the same arguments and reads in a worker thread."""
+        import asyncio
+        return await asyncio.to_thread(self.load, dataset_id, **kwargs)
+
     def get(
         self,
         dataset_id: str,
@@ -104,6 +303,18 @@ class RetailDataAPI:
         sample_fraction: Optional[float] = None,
         stratify_col: Optional[str] = None,
         split_fraction: Optional[float] = None,
+        streaming: bool = False,
+        workers: Optional[int] = None,
+        force_prepare: bool = False,
+        partition_by: Optional[List[str]] = None,
+        partition_date_col: Optional[str] = None,
+        row_group_size: Optional[int] = None,
+        statistics: Union[bool, str] = True,
+        seed: int = 0,
+        split_key: Optional[List[str]] = None,
+        compact: bool = False,
+        prepared_format: str = "parquet",
+        ipc_compression: str = "uncompressed",
         **kwargs
     ) -> Optional[Dict[str, Any]]:
         """Alias for ``download`` matching the public API contract."""
@@ -116,6 +327,18 @@ class RetailDataAPI:
             sample_fraction=sample_fraction,
             stratify_col=stratify_col,
             split_fraction=split_fraction,
+            streaming=streaming,
+            workers=workers,
+            force_prepare=force_prepare,
+            partition_by=partition_by,
+            partition_date_col=partition_date_col,
+            row_group_size=row_group_size,
+            statistics=statistics,
+            seed=seed,
+            split_key=split_key,
+            compact=compact,
+            prepared_format=prepared_format,
+            ipc_compression=ipc_compression,
             **kwargs,
         )
 
@@ -124,16 +347,31 @@ class RetailDataAPI:
         dataset_id: str, 
         data_dir: Optional[Path] = None, 
         lazy: bool = False,
-        standardized: bool = False
+        standardized: bool = False,
+        tables: Optional[List[str]] = None,
+        columns: Optional[List[str]] = None,
+        filters: Optional[Any] = None,
+        cache: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
-        Loads prepared Parquet files for a dataset.
+        Loads prepared Parquet files (single files or Hive-partitioned directories),
+        Arrow IPC files and DuckDB tables for a dataset.
+
+        Tables are scanned lazily and ``columns``/``filters`` are pushed into the
+        Parquet and DuckDB scans, so eager loads only materialize what was asked for.
         
         Args:
             dataset_id: The ID of the dataset to load.
             data_dir: Optional directory.
             lazy: If True, returns Polars LazyFrames.
             standardized: If True, uses the dataset's standard_mapping to rename keys (e.g. 'sales', 'calendar').
+            tables: Only load these tables (standard keys like 'sales' are accepted with standardized=True).
+                Their '_train'/'_test' splits are included.
+            columns: Only load these columns; each table keeps the ones it has.
+            filters: A Polars expression, or a list of them combined with AND, e.g.
+                pl.col("date").is_between(start, end). Applied to every table that has the referenced columns.
+            cache: Memoize eager loads in-process (default: settings.load_cache_enabled). Entries are
+                keyed on table, columns and filters and dropped when the prepared files change.
         
         Returns:
             A dictionary mapping keys to Polars DataFrames (or LazyFrames).
@@ -144,29 +382,104 @@ class RetailDataAPI:
         
         if not prepared_dir.exists():
             raise FileNotFoundError(f"Prepared data for '{dataset_id}' not found at {prepared_dir}")
+
+        wanted = self._resolve_tables(dataset_id, tables, standardized)
+        found = set()
+
+        def selected(key: str) -> bool:
+            base = _base_table(key)
+            found.update((key, base))
+            return wanted is None or key in wanted or base in wanted
             
-        data = {}
+        # Table key -> (files backing the table, function opening it)
+        sources: Dict[str, Any] = {}
         for file_path in prepared_dir.glob("*.parquet"):
             key = file_path.stem
-            if lazy:
-                data[key] = pl.scan_parquet(file_path)
-            else:
-                data[key] = pl.read_parquet(file_path)
+            if selected(key):
+                sources[key] = ([file_path], lambda path=file_path: pl.scan_parquet(path))
+
+        # Arrow IPC/Feather files are memory-mapped and preferred over Parquet copies of the same table
+        for file_path in prepared_dir.glob("*.arrow"):
+            key = file_path.stem
+            if selected(key):
+                sources[key] = ([file_path], lambda path=file_path: pl.scan_ipc(path, memory_map=True))
+
+        # Hive-partitioned tables (<table>/<key>=<value>/...): partition filters prune whole directories
+        for table_dir in prepared_dir.iterdir():
+            if table_dir.is_dir() and next(table_dir.rglob("*.parquet"), None) is not None and selected(table_dir.name):
+                sources[table_dir.name] = (
+                    list(table_dir.rglob("*.parquet")),
+                    lambda path=table_dir: pl.scan_parquet(path / "**" / "*.parquet", hive_partitioning=True)
+                )
         
-        # Check for DuckDB files (M7: dlt integration)
+        # Check for DuckDB files (M7: dlt integration), read via Arrow record batches.
+        # Lazy tables defer all reading to collect() and push projections/filters into DuckDB.
         for file_path in prepared_dir.glob("*.duckdb"):
-            import duckdb
-            con = duckdb.connect(str(file_path))
-            tables = con.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'").fetchall()
-            for (table_name,) in tables:
-                if table_name.startswith("_dlt"):
-                    continue
-                if lazy:
-                    data[table_name] = pl.read_database(f"SELECT * FROM {table_name}", connection=con).lazy()
-                else:
-                    data[table_name] = pl.read_database(f"SELECT * FROM {table_name}", connection=con)
-            con.close()
-        
+            from retaildata.processing.duckdb_export import list_tables, read_table, scan_table
+            reader = scan_table if lazy or columns is not None or filters is not None else read_table
+            for table_name in list_tables(file_path):
+                if selected(table_name):
+                    sources[table_name] = ([file_path], lambda path=file_path, table=table_name: reader(path, table))
+
+        missing = sorted(wanted - found) if wanted is not None else []
+        if missing:
+            raise KeyError(f"Tables {missing} not found in prepared data for '{dataset_id}'")
+
+        predicate = pl.all_horizontal(filters) if isinstance(filters, (list, tuple)) else filters
+        meta_dir = base_dir / "meta" / dataset_id
+
+        # Opt-in memoization of eager loads, invalidated when the backing files change
+        data = {}
+        signatures = {}
+        use_cache = not lazy and (settings.load_cache_enabled if cache is None else cache)
+        if use_cache and predicate is not None:
+            try:
+                predicate_key = predicate.meta.serialize(format="json")
+            except pl.exceptions.ComputeError:
+                # Filters with Python UDFs (e.g. map_elements) cannot be serialized into a key
+                use_cache = False
+        if use_cache:
+            from retaildata.cache.memory import load_cache, file_signature
+            manifest_files = [p for p in [meta_dir / "prepared_manifest.json"] if p.exists()]
+            request = (
+                tuple(columns) if columns is not None else None,
+                predicate_key if predicate is not None else None,
+            )
+            for key, (files, _) in sources.items():
+                signatures[key] = ((dataset_id, str(base_dir), key) + request, file_signature(files + manifest_files))
+                cached = load_cache.get(*signatures[key])
+                if cached is not None:
+                    data[key] = cached
+
+        # Restore dtypes chosen by compaction (Enums share one dictionary across train/test),
+        # then apply filters before the projection so they may use columns that are not returned
+        from retaildata.processing.manifest import PreparedManifest
+        from retaildata.processing.schema import cast_to
+        recorded = PreparedManifest.recorded_dtypes(meta_dir)
+        pending = []
+        for key, (_, open_frame) in sources.items():
+            if key in data:
+                continue
+            frame = open_frame()
+            if key in recorded:
+                frame = cast_to(frame, recorded[key])
+            names = frame.collect_schema().names()
+            if predicate is not None and set(predicate.meta.root_names()) <= set(names):
+                frame = frame.filter(predicate)
+            if columns is not None:
+                frame = frame.select([col for col in columns if col in names])
+            data[key] = frame
+            pending.append(key)
+
+        if not lazy:
+            # Collect all tables in one call so Polars can read them in parallel
+            # (eager DuckDB reads already arrive as DataFrames)
+            lazy_keys = [key for key in pending if isinstance(data[key], pl.LazyFrame)]
+            data.update(zip(lazy_keys, pl.collect_all([data[key] for key in lazy_keys])))
+            if use_cache:
+                for key in pending:
+                    load_cache.put(*signatures[key], data[key])
+
         if standardized:
             dataset = self.get_dataset(dataset_id)
             if dataset and dataset.standard_mapping:
@@ -183,46 +496,178 @@ class RetailDataAPI:
 
         return data
 
+    def _resolve_tables(self, dataset_id: str, tables: Optional[List[str]], standardized: bool) -> Optional[set]:
+        """Maps requested table names to prepared table keys (standard keys when standardized)."""
+        if tables is None:
+            return None
+        if isinstance(tables, str):
+            tables = [tables]
+        dataset = self.get_dataset(dataset_id)
+        mapping = dataset.standard_mapping if standardized and dataset and dataset.standard_mapping else {}
+        return {mapping.get(name, name) for name in tables}
+
     def split_temporal(
         self, 
         dataset_id: str, 
         date_col: str, 
-        split_date: str, 
+        split_date: Union[str, List[str]], 
         table_key: Optional[str] = None,
-        data_dir: Optional[Path] = None
+        data_dir: Optional[Path] = None,
+        lazy: bool = False
     ) -> Dict[str, Any]:
         """
         Splits a specific table in the dataset into train and test sets based on a date.
+
+        Only the target table is scanned. ``split_date`` may be a list of cutoffs:
+        the table is then read and its date column parsed once, sorted, and every
+        train/test pair is a zero-copy slice of that one scan. With ``lazy=True``
+        LazyFrames are returned and the date predicates are pushed into the scan.
+
+        Returns:
+            ``{"train": ..., "test": ...}`` for a single cutoff, or
+            ``{cutoff: {"train": ..., "test": ...}}`` for a list of cutoffs.
         """
         import polars as pl
-        data = self.load(dataset_id, data_dir=data_dir)
-        
-        # Identify which table to split
+        from retaildata.utils.temporal import parse_dates, cutoff_values, split_sorted
+
+        lf = parse_dates(self._scan_table(dataset_id, table_key, data_dir), date_col)
+        cutoffs = split_date if isinstance(split_date, (list, tuple)) else [split_date]
+
+        if lazy:
+            values = cutoff_values(cutoffs, lf.collect_schema()[date_col])
+            splits = [
+                {
+                    "train": lf.filter(pl.col(date_col) < pl.lit(value, dtype=values.dtype)),
+                    "test": lf.filter(pl.col(date_col) >= pl.lit(value, dtype=values.dtype)),
+                }
+                for value in values
+            ]
+        else:
+            df = lf.sort(date_col, nulls_last=True, maintain_order=True).collect()
+            splits = split_sorted(df, date_col, cutoffs)
+
+        if isinstance(split_date, (list, tuple)):
+            return dict(zip(split_date, splits))
+        return splits[0]
+
+
+    def backtest(
+        self,
+        dataset_id: str,
+        date_col: str,
+        horizon: int,
+        n_folds: int,
+        step: Optional[int] = None,
+        gap: int = 0,
+        window: str = "expanding",
+        train_size: Optional[int] = None,
+        series_col: Optional[Union[str, List[str]]] = None,
+        table_key: Optional[str] = None,
+        data_dir: Optional[Path] = None,
+        lazy: bool = False
+    ) -> List[Any]:
+        """
+        Rolling-origin backtest folds for one table of a dataset.
+
+        The table is read (or, with ``lazy=True``, scanned) once; see
+        ``retaildata.utils.temporal.backtest_folds`` for the fold arguments.
+        Each returned ``Fold`` unpacks to ``(train, test)`` and exposes its row ranges.
+        """
+        from retaildata.utils.temporal import backtest_folds
+
+        lf = self._scan_table(dataset_id, table_key, data_dir)
+        return backtest_folds(
+            lf if lazy else lf.collect(), date_col, horizon, n_folds,
+            step=step, gap=gap, window=window, train_size=train_size, series_col=series_col
+        )
+
+    def query(
+        self,
+        sql: str,
+        data_dir: Optional[Path] = None,
+        datasets: Optional[List[str]] = None,
+        arrow: bool = False
+    ) -> Any:
+        """
+        Runs SQL against every prepared table through an embedded DuckDB catalog.
+
+        Tables are addressed as ``<dataset>.<table>`` (Parquet, partitioned Parquet,
+        Arrow IPC and dlt DuckDB tables alike), so joins and aggregations across
+        datasets run inside DuckDB, out-of-core and multi-threaded.
+
+        Args:
+            sql: The query, e.g. 'SELECT store_nbr, sum(sales) FROM store_sales.train GROUP BY 1'.
+            data_dir: Optional directory.
+            datasets: Only expose these datasets (default: all prepared datasets).
+            arrow: If True, return a streaming ``pyarrow.RecordBatchReader`` instead of a Polars DataFrame;
+                the underlying connection is closed once the reader is exhausted.
+        """
+        import polars as pl
+        from retaildata.processing.catalog import connect
+        from retaildata.processing.duckdb_export import BATCH_ROWS
+
+        con = connect(data_dir or settings.final_data_dir, datasets)
+        handed_over = False
+        try:
+            reader = con.execute(sql).fetch_record_batch(BATCH_ROWS)
+            if not arrow:
+                return pl.from_arrow(reader, rechunk=False)
+            # The caller streams the result, so the connection lives until the reader is exhausted
+            import pyarrow as pa
+            handed_over = True
+            return pa.RecordBatchReader.from_batches(reader.schema, _closing_batches(reader, con))
+        finally:
+            if not handed_over:
+                con.close()
+
+    def _scan_table(self, dataset_id: str, table_key: Optional[str], data_dir: Optional[Path]) -> Any:
+        """LazyFrame of one table: ``table_key``, else the standard 'sales' table, else the first one."""
         if table_key:
             key = table_key
         else:
             # Try 'sales' from standard mapping, or fallback to first table
+            tables = list(self.load(dataset_id, data_dir=data_dir, lazy=True))
             dataset = self.get_dataset(dataset_id)
             if dataset and dataset.standard_mapping:
-                key = dataset.standard_mapping.get("sales", list(data.keys())[0])
+                key = dataset.standard_mapping.get("sales", tables[0])
             else:
-                key = list(data.keys())[0]
+                key = tables[0]
+        return self.load(dataset_id, data_dir=data_dir, lazy=True, tables=[key])[key]
 
-        df = data[key]
-        if isinstance(df, pl.LazyFrame):
-            df = df.collect()
-            
-        # Ensure date_col is datetime/date
-        if df[date_col].dtype not in [pl.Datetime, pl.Date]:
-            df = df.with_columns(pl.col(date_col).str.to_datetime())
 
-        # Convert split_date string to datetime for comparison
-        split_dt = pl.lit(split_date).str.to_datetime()
-        
-        train = df.filter(pl.col(date_col) < split_dt)
-        test = df.filter(pl.col(date_col) >= split_dt)
-        
-        return {"train": train, "test": test}
+def _closing_batches(reader: Any, con: Any) -> Any:
+    """Yields the batches of a DuckDB reader, closing its connection afterwards."""
+    try:
+        yield from reader
+    finally:
+        con.close()
+
+
+@dataclass
+class GetResult:
+    """Outcome of one dataset in ``get_many``."""
+    dataset_id: str
+    error: Optional[str] = None
+    prepared: Optional[bool] = None  # None when prepare was not requested; False if any file failed
+    prepare_errors: Dict[str, str] = field(default_factory=dict)  # failed files or tables -> error
+    download_seconds: float = 0.0
+    prepare_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.prepared is not False
+
+
+# Keyword arguments of download/get that configure the prepare step
+_PREPARE_ARGS = set(inspect.signature(RetailDataAPI._prepare).parameters) - {"self", "dataset", "target_dir"}
+
+
+def _base_table(key: str) -> str:
+    """Strips the '_train'/'_test' suffix added by prepare's split."""
+    for suffix in ("_train", "_test"):
+        if key.endswith(suffix):
+            return key[:-len(suffix)]
+    return key
 
 
 api = RetailDataAPI()
@@ -238,9 +683,36 @@ def get(dataset_id: str, data_dir: Optional[Path] = None, cache: bool = True, pr
     return api.get(dataset_id=dataset_id, data_dir=data_dir, cache=cache, prepare=prepare, **kwargs)
 
 
-def load(dataset_id: str, data_dir: Optional[Path] = None, lazy: bool = False, standardized: bool = False) -> Dict[str, Any]:
-    """Load prepared dataset artifacts."""
-    return api.load(dataset_id=dataset_id, data_dir=data_dir, lazy=lazy, standardized=standardized)
+def get_many(dataset_ids: List[str], data_dir: Optional[Path] = None, prepare: bool = False, jobs: int = 4, **kwargs) -> Dict[str, GetResult]:
+    """Download (and optionally prepare) many datasets concurrently; failures are reported per dataset."""
+    return api.get_many(dataset_ids, data_dir=data_dir, prepare=prepare, jobs=jobs, **kwargs)
+
+
+async def aget(dataset_id: str, data_dir: Optional[Path] = None, cache: bool = True, prepare: bool = False, **kwargs) -> Optional[Dict[str, Any]]:
+    """Async ``get``: overlaps with other downloads on the same event loop."""
+    return await api.aget(dataset_id=dataset_id, data_dir=data_dir, cache=cache, prepare=prepare, **kwargs)
+
+
+def load(
+    dataset_id: str,
+    data_dir: Optional[Path] = None,
+    lazy: bool = False,
+    standardized: bool = False,
+    tables: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+    filters: Optional[Any] = None,
+    cache: Optional[bool] = None
+) -> Dict[str, Any]:
+    """Load prepared dataset artifacts, optionally only some tables, columns and rows."""
+    return api.load(
+        dataset_id=dataset_id, data_dir=data_dir, lazy=lazy, standardized=standardized,
+        tables=tables, columns=columns, filters=filters, cache=cache
+    )
+
+
+async def aload(dataset_id: str, **kwargs) -> Dict[str, Any]:
+    """Async ``load``; accepts the same arguments."""
+    return await api.aload(dataset_id, **kwargs)
 
 
 def purge(dataset_id: Optional[str] = None, all: bool = False) -> None:
@@ -254,3 +726,8 @@ def purge(dataset_id: Optional[str] = None, all: bool = False) -> None:
         cache_manager.delete_dataset(dataset_id)
         return
     raise ValueError("Pass dataset_id or all=True to purge data")
+
+
+def query(sql: str, data_dir: Optional[Path] = None, datasets: Optional[List[str]] = None, arrow: bool = False) -> Any:
+    """Run SQL over prepared tables, addressed as <dataset>.<table>."""
+    return api.query(sql=sql, data_dir=data_dir, datasets=datasets, arrow=arrow)
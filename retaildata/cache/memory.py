@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+from retaildata.config import settings
+
+# (path, mtime_ns, size) of every file a cached table was read from
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+def file_signature(paths: Iterable[Path]) -> Signature:
+    """Identifies the on-disk state of the files behind a table; any rewrite changes it."""
+    entries = []
+    for path in sorted(paths):
+        stat = path.stat()
+        entries.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(entries)
+
+
+class LoadCache:
+    """
+    In-process LRU cache of eagerly loaded frames, bounded by memory.
+
+    Entries are keyed by dataset, table and requested projection/filters and
+    remember the signature of the files they were read from. A lookup with a
+    different signature drops the entry, so rewritten prepared files are never
+    served stale.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = settings.load_cache_max_bytes if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.current_bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Signature, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, signature: Signature) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1].clone()
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, signature: Signature, frame: Any):
+        size = frame.estimated_size()
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (signature, frame.clone(), size)
+            self.current_bytes += size
+
+    def _drop(self, key: Hashable):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+load_cache = LoadCache()
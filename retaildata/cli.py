@@ -3,7 +3,7 @@ import rich
 from rich import print as rprint
 from rich.console import Console
 from rich.table import Table
-from typing import Optional
+from typing import List, Optional
 from pathlib import Path
 from retaildata.datasets.registry import Registry, Dataset
 from retaildata.api import RetailDataAPI
@@ -79,25 +79,74 @@ def info(dataset_id: str):
 
 @app.command(name="get")
 def get(
-    dataset_id: str,
+    dataset_ids: List[str] = typer.Argument(..., help="One or more dataset IDs"),
     output_dir: Optional[Path] = typer.Option(None, "--output", "-o", help="Custom output directory"),
     cache: bool = typer.Option(True, help="Use cached version if available (default: on)"),
     prepare: bool = typer.Option(False, "--prepare", "-p", help="Convert to Parquet after download"),
     sample: Optional[float] = typer.Option(None, "--sample", help="Fraction of data to sample (0.0 to 1.0)"),
     stratify: Optional[str] = typer.Option(None, "--stratify", help="Column name for stratified sampling"),
-    split: Optional[float] = typer.Option(None, "--split", help="Fraction for train/test split (e.g. 0.8)")
+    split: Optional[float] = typer.Option(None, "--split", help="Fraction for train/test split (e.g. 0.8)"),
+    streaming: bool = typer.Option(False, "--streaming", help="Prepare out-of-core (bounded memory) via lazy scans"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Processes used to prepare files in parallel (0 = one per CPU)"),
+    force: bool = typer.Option(False, "--force", help="Re-prepare files even if the raw data and options are unchanged"),
+    partition_by: Optional[List[str]] = typer.Option(None, "--partition-by", help="Column to Hive-partition prepared tables by (repeatable)"),
+    partition_date: Optional[str] = typer.Option(None, "--partition-date", help="Date column whose year/month become partition keys"),
+    row_group_size: Optional[int] = typer.Option(None, "--row-group-size", help="Rows per Parquet row group"),
+    statistics: str = typer.Option("true", "--statistics", help="Parquet column statistics: true, false or full"),
+    seed: int = typer.Option(0, "--seed", help="Seed for sampling and splitting"),
+    split_key: Optional[List[str]] = typer.Option(None, "--split-key", help="Column whose groups stay on one side of the split (repeatable)"),
+    compact: bool = typer.Option(False, "--compact", help="Store low-cardinality strings as Enums and downcast numeric columns"),
+    prepared_format: str = typer.Option("parquet", "--format", help="Prepared file format: parquet, ipc (Arrow, memory-mapped on load) or both"),
+    ipc_compression: str = typer.Option("uncompressed", "--ipc-compression", help="Compression of IPC files: uncompressed or lz4"),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Datasets downloaded concurrently (prepares are pipelined behind downloads)"),
+    segments: Optional[int] = typer.Option(None, "--segments", help="Parallel connections for a large single-file HTTP download (1 = one stream)")
 ):
-    """Download a dataset."""
+    """Download one or more datasets."""
+    options = dict(
+        cache=cache,
+        prepare=prepare,
+        sample_fraction=sample,
+        stratify_col=stratify,
+        split_fraction=split,
+        streaming=streaming,
+        workers=workers,
+        force_prepare=force,
+        partition_by=partition_by or None,
+        partition_date_col=partition_date,
+        row_group_size=row_group_size,
+        statistics="full" if statistics.lower() == "full" else statistics.lower() not in ("false", "0", "no", "off"),
+        seed=seed,
+        split_key=split_key or None,
+        compact=compact,
+        prepared_format=prepared_format,
+        ipc_compression=ipc_compression,
+        segments=segments
+    )
+    if len(dataset_ids) > 1 or jobs:
+        results = api.get_many(dataset_ids, data_dir=output_dir, jobs=jobs or 4, **options)
+        table = Table(title="Download Summary")
+        table.add_column("Dataset", style="cyan")
+        table.add_column("Status")
+        table.add_column("Download", justify="right")
+        table.add_column("Prepare", justify="right")
+        for r in results.values():
+            if r.ok:
+                status = "[green]OK[/green]"
+            elif r.error:
+                status = f"[red]Failed: {r.error}[/red]"
+            elif r.prepare_errors:
+                status = f"[red]Prepare failed for {', '.join(r.prepare_errors)}[/red]"
+            else:
+                status = "[red]Failed: prepare failed[/red]"
+            table.add_row(r.dataset_id, status, f"{r.download_seconds:.1f}s", f"{r.prepare_seconds:.1f}s" if r.prepared is not None else "-")
+        console.print(table)
+        if not all(r.ok for r in results.values()):
+            raise typer.Exit(code=1)
+        return
+
+    dataset_id = dataset_ids[0]
     try:
-        api.download(
-            dataset_id, 
-            data_dir=output_dir, 
-            cache=cache, 
-            prepare=prepare,
-            sample_fraction=sample,
-            stratify_col=stratify,
-            split_fraction=split
-        )
+        api.download(dataset_id, data_dir=output_dir, **options)
         console.print(f"[bold green]Successfully processed dataset '{dataset_id}'[/bold green]")
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
@@ -135,58 +184,77 @@ def inspect(
 
     # Find files to inspect
     files = list(data_path.rglob("*"))
-    files = [f for f in files if f.is_file() and f.suffix.lower() in [".csv", ".parquet", ".xlsx", ".xls"]]
+    files = [f for f in files if f.is_file() and f.suffix.lower() in [".csv", ".parquet", ".arrow", ".xlsx", ".xls"]]
     
     if not files:
         rprint("[yellow]No suitable data files found to inspect.[/yellow]")
         return
 
+    import json
+    meta_dir = base_dir / "meta" / dataset_id
+    checksums = {}
+    if not prepared and (meta_dir / "checksums.json").exists():
+        with open(meta_dir / "checksums.json", "r") as f:
+            checksums = json.load(f)
+
     for file_path in files:
         rprint(f"[bold underline]File: {file_path.name}[/bold underline]")
         try:
             # Read a sample for inspection
             if file_path.suffix.lower() == ".parquet":
-                df = pl.read_parquet(file_path) # Parquet is fast enough
+                frames = {None: pl.read_parquet(file_path)} # Parquet is fast enough
+            elif file_path.suffix.lower() == ".arrow":
+                frames = {None: pl.read_ipc(file_path, memory_map=True)}
             elif file_path.suffix.lower() == ".csv":
-                schema = dataset.expected_schema or None
-                df = pl.read_csv(
+                from retaildata.processing.schema import csv_schema, parse_dtype
+                # Reuse the schema persisted by prepare when the raw checksum is known
+                checksum = checksums.get(str(file_path.relative_to(data_path)))
+                schema = csv_schema(file_path, meta_dir, checksum)
+                for col, dtype in (dataset.expected_schema or {}).items():
+                    if col in schema:
+                        schema[col] = parse_dtype(dtype, default=pl.String)
+                frames = {None: pl.read_csv(
                     file_path, 
                     n_rows=1000, 
                     ignore_errors=True, 
-                    infer_schema_length=10000,
-                    schema_overrides=schema
-                ) # Only first 1000 for raw
+                    schema=schema
+                )} # Only first 1000 for raw
             else:
-                df = pl.read_excel(file_path)
+                # All sheets, parsed in parallel and cached for later prepare runs
+                from retaildata.processing.excel import read_workbook
+                frames = read_workbook(file_path)
             
-            # Schema Table
-            schema_table = Table(title="Schema")
-            schema_table.add_column("Column")
-            schema_table.add_column("DType")
-            schema_table.add_column("Status")
+            for sheet, df in frames.items():
+                if sheet is not None:
+                    rprint(f"[bold]Sheet: {sheet}[/bold]")
+                # Schema Table
+                schema_table = Table(title="Schema")
+                schema_table.add_column("Column")
+                schema_table.add_column("DType")
+                schema_table.add_column("Status")
             
-            actual_schema = df.collect_schema()
-            expected = dataset.expected_schema or {}
+                actual_schema = df.collect_schema()
+                expected = dataset.expected_schema or {}
             
-            for col, dtype in actual_schema.items():
-                status = "[green]OK[/green]"
-                if col in expected:
-                    if str(dtype) != expected[col]:
-                        status = f"[yellow]Expected {expected[col]}[/yellow]"
-                schema_table.add_row(col, str(dtype), status)
+                for col, dtype in actual_schema.items():
+                    status = "[green]OK[/green]"
+                    if col in expected:
+                        if str(dtype) != expected[col]:
+                            status = f"[yellow]Expected {expected[col]}[/yellow]"
+                    schema_table.add_row(col, str(dtype), status)
             
-            rprint(schema_table)
+                rprint(schema_table)
             
-            # Basic Stats
-            rprint(f"[bold]Shape:[/bold] {df.shape[0]} rows, {df.shape[1]} columns")
+                # Basic Stats
+                rprint(f"[bold]Shape:[/bold] {df.shape[0]} rows, {df.shape[1]} columns")
             
-            # Descriptive stats for numeric columns
-            numeric_cols = [c for c, t in actual_schema.items() if t in [pl.Int64, pl.Float64, pl.Int32, pl.Float32]]
-            if numeric_cols:
-                rprint("\n[bold]Numerical Summary:[/bold]")
-                print(df.select(numeric_cols).describe())
+                # Descriptive stats for numeric columns
+                numeric_cols = [c for c, t in actual_schema.items() if t in [pl.Int64, pl.Float64, pl.Int32, pl.Float32]]
+                if numeric_cols:
+                    rprint("\n[bold]Numerical Summary:[/bold]")
+                    print(df.select(numeric_cols).describe())
             
-            rprint("\n" + "-"*40 + "\n")
+                rprint("\n" + "-"*40 + "\n")
 
         except Exception as e:
             rprint(f"[red]Error inspecting {file_path.name}: {e}[/red]")
@@ -288,6 +356,39 @@ def auth(
         console.print(f"[red]Unknown action: {action}[/red]")
         raise typer.Exit(code=1)
 
+@app.command()
+def sql(
+    statement: str = typer.Argument(..., help="SQL query; tables are named <dataset>.<table>"),
+    output: Optional[Path] = typer.Option(None, "--output", help="Custom data directory"),
+    save: Optional[Path] = typer.Option(None, "--save", help="Write the full result to a .parquet, .arrow or .csv file"),
+    limit: int = typer.Option(50, "--limit", help="Rows to display"),
+):
+    """Run SQL over all prepared datasets with DuckDB."""
+    try:
+        df = api.query(statement, data_dir=output)
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise typer.Exit(code=1)
+
+    if save:
+        suffix = save.suffix.lower()
+        if suffix == ".csv":
+            df.write_csv(save)
+        elif suffix == ".arrow":
+            df.write_ipc(save)
+        else:
+            df.write_parquet(save)
+        console.print(f"[green]Saved {len(df)} rows to {save}[/green]")
+
+    table = Table(title=f"{len(df)} rows")
+    for col, dtype in df.schema.items():
+        table.add_column(f"{col}\n[dim]{dtype}[/dim]")
+    for row in df.head(limit).iter_rows():
+        table.add_row(*("" if v is None else str(v) for v in row))
+    console.print(table)
+    if len(df) > limit:
+        console.print(f"[dim]... {len(df) - limit} more rows (use --limit or --save)[/dim]")
+
 @app.command()
 def rm(dataset_id: str):
     """Remove a dataset from the local cache."""
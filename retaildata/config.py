@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from platformdirs import user_data_dir, user_cache_dir
 
@@ -16,6 +16,19 @@ class Settings(BaseSettings):
     
     # Cache settings
     cache_enabled: bool = True
+    load_cache_enabled: bool = False  # memoize eager load() results in-process
+    load_cache_max_bytes: int = 2 * 1024**3
+
+    # Download settings: concurrent downloads per provider for get_many / `get --jobs`
+    provider_concurrency: Dict[str, int] = {"http": 8, "kaggle": 2, "hf": 4, "uci": 4, "openml": 4, "dlt": 1}
+    download_concurrency: int = 16  # upper bound of adaptive concurrency for multi-file HTTP downloads
+    download_per_host: int = 8  # concurrent transfers against one host
+    download_segments: int = 4  # connections per large single-file HTTP download (1 = one stream)
+    download_segment_size: int = 16 * 1024**2  # bytes per ranged request; smaller files use one stream
+
+    # Prepare settings
+    prepare_workers: int = 1  # 0 = one worker per CPU
+    prepare_memory_fraction: float = 0.75  # share of available RAM parallel prepare may plan for
     
     model_config = SettingsConfigDict(env_prefix="RETAILDATA_")
 
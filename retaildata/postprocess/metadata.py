@@ -31,16 +31,22 @@ class MetadataManager:
         return sha256_hash.hexdigest()
 
     @staticmethod
-    def save_checksums(base_dir: Path, checksums_path: Path):
-        """Generates and saves checksums for all files in base_dir."""
+    def save_checksums(base_dir: Path, checksums_path: Path, known: Optional[Dict[str, str]] = None):
+        """
+        Generates and saves checksums for all files in base_dir.
+
+        ``known`` maps relative paths to SHA256 digests already computed while the
+        files were downloaded; only the other files are read to hash them.
+        """
         checksums = {}
-        processed_files = []
+        known = known or {}
         
         # Traverse all files in data directory
         for file_path in base_dir.rglob("*"):
-            if file_path.is_file() and file_path != checksums_path:
+            # Partial downloads are not part of the dataset until they are renamed into place
+            if file_path.is_file() and file_path != checksums_path and file_path.suffix != ".part":
                 rel_path = str(file_path.relative_to(base_dir))
-                checksums[rel_path] = MetadataManager.calculate_checksum(file_path)
+                checksums[rel_path] = known.get(rel_path) or MetadataManager.calculate_checksum(file_path)
         
         checksums_path.parent.mkdir(parents=True, exist_ok=True)
         with open(checksums_path, "w") as f:
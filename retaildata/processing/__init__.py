@@ -1,3 +1,12 @@
-from .manager import ProcessingManager
+from .tasks import PrepareOptions, PrepareResult
 
-__all__ = ["ProcessingManager"]
+__all__ = ["ProcessingManager", "PrepareOptions", "PrepareResult"]
+
+
+def __getattr__(name):
+    # The manager pulls in Polars; spawned prepare workers import this package
+    # (for their initializer) before their native thread limit is in place.
+    if name == "ProcessingManager":
+        from .manager import ProcessingManager
+        return ProcessingManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,74 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+from retaildata.processing.duckdb_export import _quote, list_tables
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError(
+            "duckdb is not installed. Please install it with: pip install \"retaildata[dlt]\""
+        )
+    return duckdb
+
+
+def _sql_path(path: Path) -> str:
+    return "'" + path.as_posix().replace("'", "''") + "'"
+
+
+def prepared_tables(prepared_dir: Path) -> Dict[str, str]:
+    """
+    Maps every prepared table of one dataset to the DuckDB expression reading it.
+
+    Mirrors ``load``: single Parquet files, Hive-partitioned directories, and
+    Arrow IPC files (preferred over a Parquet copy of the same table). Tables
+    of dlt ``.duckdb`` files are attached separately by ``connect``.
+    """
+    tables = {}
+    for path in sorted(prepared_dir.glob("*.parquet")):
+        tables[path.stem] = f"read_parquet({_sql_path(path)})"
+    for path in sorted(prepared_dir.iterdir()):
+        if path.is_dir() and next(path.rglob("*.parquet"), None) is not None:
+            tables[path.name] = f"read_parquet({_sql_path(path / '**' / '*.parquet')}, hive_partitioning = true)"
+    for path in sorted(prepared_dir.glob("*.arrow")):
+        tables[path.stem] = None  # registered as a memory-mapped Arrow dataset
+    return tables
+
+
+def connect(data_dir: Path, datasets: Optional[List[str]] = None):
+    """
+    Opens an in-memory DuckDB catalog over the prepared data in ``data_dir``.
+
+    Every dataset becomes a schema and every prepared table a view, so queries
+    address tables as ``<dataset>.<table>``. Views only reference the files;
+    DuckDB reads them out-of-core and multi-threaded when a query runs.
+    """
+    duckdb = _duckdb()
+    con = duckdb.connect()
+    prepared_root = data_dir / "prepared"
+    if not prepared_root.exists():
+        return con
+
+    for dataset_dir in sorted(p for p in prepared_root.iterdir() if p.is_dir()):
+        dataset_id = dataset_dir.name
+        if datasets is not None and dataset_id not in datasets:
+            continue
+        schema = _quote(dataset_id)
+        con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+
+        for db_file in sorted(dataset_dir.glob("*.duckdb")):
+            alias = _quote(f"__{dataset_id}_{db_file.stem}")
+            con.execute(f"ATTACH {_sql_path(db_file)} AS {alias} (READ_ONLY)")
+            for table in list_tables(db_file):
+                con.execute(f"CREATE OR REPLACE VIEW {schema}.{_quote(table)} AS SELECT * FROM {alias}.main.{_quote(table)}")
+
+        for table, source in prepared_tables(dataset_dir).items():
+            if source is None:
+                import pyarrow.dataset as ds
+
+                name = f"__{dataset_id}_{table}_arrow"
+                con.register(name, ds.dataset(dataset_dir / f"{table}.arrow", format="ipc"))
+                source = _quote(name)
+            con.execute(f"CREATE OR REPLACE VIEW {schema}.{_quote(table)} AS SELECT * FROM {source}")
+    return con
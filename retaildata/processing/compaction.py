@@ -0,0 +1,86 @@
+from typing import Any, Dict, Tuple, TypeVar
+import polars as pl
+from retaildata.processing.schema import dtype_to_json, dtype_from_json
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+# Strings with at most this many distinct values become an Enum ...
+MAX_CATEGORIES = 65_536
+# ... as long as the dictionary is clearly smaller than the column itself.
+MAX_CARDINALITY_RATIO = 0.5
+
+# Candidate integer widths, smallest first. Unsigned types are avoided on
+# purpose: arithmetic like differences or lags would silently wrap.
+_INT_TYPES = [(pl.Int8, -2**7, 2**7 - 1), (pl.Int16, -2**15, 2**15 - 1), (pl.Int32, -2**31, 2**31 - 1)]
+
+
+def _profile(frame: Any) -> Dict[str, Any]:
+    """
+    One aggregation pass collecting everything the compaction decisions need.
+
+    Runs on the streaming engine, so profiling a lazy source keeps memory bounded.
+    """
+    schema = frame.collect_schema()
+    aggs = [pl.len().alias("__rows")]
+    for col, dtype in schema.items():
+        if dtype == pl.String:
+            aggs.append(pl.col(col).approx_n_unique().alias(f"{col}__n_unique"))
+        elif dtype in (pl.Int64, pl.Int32, pl.Int16):
+            aggs += [pl.col(col).min().alias(f"{col}__min"), pl.col(col).max().alias(f"{col}__max")]
+        elif dtype == pl.Float64:
+            c = pl.col(col)
+            lossless = (c.cast(pl.Float32).cast(pl.Float64) == c) | c.is_null() | c.is_nan()
+            aggs.append(lossless.all().alias(f"{col}__f32_lossless"))
+    return frame.lazy().select(aggs).collect(engine="streaming").row(0, named=True)
+
+
+def plan_compaction(frame: Any) -> Dict[str, Any]:
+    """
+    Decides the compact dtype of every column that can shrink.
+
+    Returns a ``{column: dtype}`` map in ``dtype_to_json`` form:
+    low-cardinality strings become an ``Enum`` with a sorted dictionary,
+    integers the narrowest signed width holding their range, and floats
+    ``Float32`` when that round-trips every value exactly.
+    """
+    schema = frame.collect_schema()
+    stats = _profile(frame)
+    rows = stats["__rows"]
+    plan: Dict[str, Any] = {}
+
+    enum_candidates = [
+        col for col, dtype in schema.items()
+        if dtype == pl.String
+        and stats[f"{col}__n_unique"] <= MAX_CATEGORIES
+        and stats[f"{col}__n_unique"] <= rows * MAX_CARDINALITY_RATIO
+    ]
+    if enum_candidates:
+        uniques = frame.lazy().select(
+            pl.col(col).drop_nulls().unique().sort().implode() for col in enum_candidates
+        ).collect(engine="streaming").row(0, named=True)
+        for col in enum_candidates:
+            plan[col] = {"Enum": uniques[col]}
+
+    for col, dtype in schema.items():
+        if f"{col}__min" in stats:
+            lo, hi = stats[f"{col}__min"], stats[f"{col}__max"]
+            if lo is None:
+                continue
+            for int_type, type_min, type_max in _INT_TYPES:
+                if int_type == dtype:
+                    break
+                if type_min <= lo and hi <= type_max:
+                    plan[col] = dtype_to_json(int_type)
+                    break
+        elif stats.get(f"{col}__f32_lossless") and rows > 0:
+            plan[col] = dtype_to_json(pl.Float32)
+
+    return plan
+
+
+def compact(frame: FrameT) -> Tuple[FrameT, Dict[str, Any]]:
+    """Applies ``plan_compaction`` and returns the compacted frame with the chosen dtypes."""
+    plan = plan_compaction(frame)
+    if not plan:
+        return frame, plan
+    return frame.with_columns(pl.col(col).cast(dtype_from_json(dtype)) for col, dtype in plan.items()), plan
@@ -0,0 +1,313 @@
+import datetime
+import io
+import json
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import polars as pl
+
+# Rows per Arrow record batch fetched from DuckDB; bounds memory per step.
+BATCH_ROWS = 1_000_000
+# Approximate in-memory bytes per value of fixed-width DuckDB types; anything else (strings, nested) counts as _VAR_WIDTH.
+_TYPE_WIDTHS = {
+    "BOOLEAN": 1, "TINYINT": 1, "UTINYINT": 1, "SMALLINT": 2, "USMALLINT": 2,
+    "INTEGER": 4, "UINTEGER": 4, "FLOAT": 4, "DATE": 4,
+    "BIGINT": 8, "UBIGINT": 8, "DOUBLE": 8, "TIMESTAMP": 8, "TIMESTAMP WITH TIME ZONE": 8, "TIME": 8,
+    "HUGEINT": 16, "UHUGEINT": 16, "INTERVAL": 16, "UUID": 16,
+}
+_VAR_WIDTH = 32
+
+
+def _connect(db_path: Path):
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError(
+            "duckdb is not installed. Please install it with: pip install \"retaildata[dlt]\""
+        )
+    return duckdb.connect(str(db_path), read_only=True)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def list_tables(db_path: Path) -> List[str]:
+    """Lists the user tables of a dlt-produced DuckDB file (internal ``_dlt*`` tables are skipped)."""
+    con = _connect(db_path)
+    try:
+        tables = con.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'").fetchall()
+    finally:
+        con.close()
+    return [name for (name,) in tables if not name.startswith("_dlt")]
+
+
+def table_sizes(db_path: Path) -> Dict[str, int]:
+    """
+    Estimated in-memory size (bytes) of every user table of a DuckDB file:
+    DuckDB's row-count estimate times the summed width of the column types.
+    """
+    con = _connect(db_path)
+    try:
+        rows = dict(con.execute("SELECT table_name, estimated_size FROM duckdb_tables() WHERE schema_name = 'main'").fetchall())
+        columns = con.execute("SELECT table_name, data_type FROM duckdb_columns() WHERE schema_name = 'main'").fetchall()
+    finally:
+        con.close()
+    widths = dict.fromkeys(rows, 0)
+    for table, data_type in columns:
+        if table in widths:
+            widths[table] += _TYPE_WIDTHS.get(data_type, 16 if data_type.startswith("DECIMAL") else _VAR_WIDTH)
+    return {table: (rows[table] or 0) * widths[table] for table in rows if not table.startswith("_dlt")}
+
+
+def record_batches(con, table: str, batch_size: int = BATCH_ROWS):
+    """Returns a ``pyarrow.RecordBatchReader`` over a table, streamed through DuckDB's Arrow interface."""
+    return con.execute(f"SELECT * FROM {_quote(table)}").fetch_record_batch(batch_size)
+
+
+def read_table(db_path: Path, table: str, batch_size: int = BATCH_ROWS) -> pl.DataFrame:
+    """
+    Reads a DuckDB table into Polars batch by batch.
+
+    The Arrow batches are adopted as DataFrame chunks without rechunking, so
+    no row-wise materialization or extra copy takes place.
+    """
+    con = _connect(db_path)
+    try:
+        return pl.from_arrow(record_batches(con, table, batch_size), rechunk=False)
+    finally:
+        con.close()
+
+
+_SQL_COMPARISONS = {"Eq": "=", "NotEq": "<>", "Lt": "<", "LtEq": "<=", "Gt": ">", "GtEq": ">="}
+_SQL_CONNECTIVES = {"And": "AND", "Or": "OR"}
+_SQL_NULL_TESTS = {"IsNull": "IS NULL", "IsNotNull": "IS NOT NULL"}
+# ``is_between(closed=...)``: operators for the lower and upper bound
+_SQL_BETWEEN = {"Both": (">=", "<="), "Left": (">=", "<"), "Right": (">", "<="), "None": (">", "<")}
+_INT_SCALARS = {"Int8", "Int16", "Int32", "Int64", "UInt8", "UInt16", "UInt32", "UInt64"}
+_TIME_UNITS = {"Milliseconds": 1_000, "Microseconds": 1, "Nanoseconds": 0.001}
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class _Untranslatable(Exception):
+    """A predicate node has no DuckDB equivalent; Polars applies it instead."""
+
+
+def _sql_literal(value: Any) -> str:
+    """SQL literal of a Python value decoded from a Polars scalar."""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float) and math.isfinite(value):
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            return f"TIMESTAMPTZ '{value.isoformat(sep=' ')}'"
+        return f"TIMESTAMP '{value.isoformat(sep=' ')}'"
+    if isinstance(value, datetime.date):
+        return f"DATE '{value.isoformat()}'"
+    raise _Untranslatable(type(value).__name__)
+
+
+def _scalar_value(dtype: str, value: Any) -> Any:
+    """Python value of a serialized Polars scalar of type ``dtype``."""
+    if dtype in _INT_SCALARS and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if dtype in ("Float32", "Float64") and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if dtype == "Boolean" and isinstance(value, bool):
+        return value
+    if dtype == "String" and isinstance(value, str):
+        return value
+    if dtype == "Date" and isinstance(value, int):
+        return datetime.date(1970, 1, 1) + datetime.timedelta(days=value)
+    if dtype == "Datetime":
+        ticks, unit, tz = value
+        scale = _TIME_UNITS[unit]
+        if scale < 1 and ticks % 1_000:
+            raise _Untranslatable("sub-microsecond datetime")
+        moment = _EPOCH + datetime.timedelta(microseconds=int(ticks * scale))
+        if tz is None:
+            return moment
+        if (tz.get("inner") if isinstance(tz, dict) else tz) == "UTC":
+            return moment.replace(tzinfo=datetime.timezone.utc)
+        raise _Untranslatable(f"time zone {tz}")
+    if dtype == "List" and isinstance(value, list):
+        # is_in() values travel as an Arrow IPC stream of the Series
+        return pl.read_ipc_stream(io.BytesIO(bytes(value))).to_series().to_list()
+    raise _Untranslatable(dtype)
+
+
+def _literal_value(node: Dict[str, Any]) -> Any:
+    """Python value of a literal node; aliases and casts to Date (``pl.date``) are looked through."""
+    (kind, value), = node.items()
+    if kind == "Alias":
+        return _literal_value(value[0])
+    if kind == "Cast" and value["dtype"] == {"Literal": "Date"}:
+        moment = _literal_value(value["expr"])
+        if isinstance(moment, datetime.datetime) and moment.tzinfo is None:
+            return moment.date()
+    if kind == "Literal":
+        (kind, value), = value.items()
+        (dtype, value), = value.items()
+        if kind == "Dyn":
+            dtype = {"Int": "Int64", "Float": "Float64", "Str": "String"}.get(dtype, dtype)
+        return _scalar_value(dtype, value)
+    raise _Untranslatable(kind)
+
+
+def _sql_operand(node: Dict[str, Any]) -> str:
+    """Translates a column reference or a literal."""
+    (kind, value), = node.items()
+    if kind == "Column" and isinstance(value, str):
+        return _quote(value)
+    return _sql_literal(_literal_value(node))
+
+
+def _sql_condition(node: Dict[str, Any]) -> str:
+    """Translates a boolean node: comparisons, AND/OR/NOT, null tests, ``is_between`` and ``is_in``."""
+    (kind, value), = node.items()
+    if kind == "BinaryExpr":
+        op = value["op"]
+        if op in _SQL_COMPARISONS:
+            return f"({_sql_operand(value['left'])} {_SQL_COMPARISONS[op]} {_sql_operand(value['right'])})"
+        if op in _SQL_CONNECTIVES:
+            return f"({_sql_condition(value['left'])} {_SQL_CONNECTIVES[op]} {_sql_condition(value['right'])})"
+    elif kind == "Function":
+        function, inputs = value["function"].get("Boolean"), value["input"]
+        if function == "Not" and len(inputs) == 1:
+            return f"(NOT {_sql_condition(inputs[0])})"
+        if isinstance(function, str) and function in _SQL_NULL_TESTS and len(inputs) == 1:
+            return f"({_sql_operand(inputs[0])} {_SQL_NULL_TESTS[function]})"
+        if isinstance(function, dict) and "IsBetween" in function and len(inputs) == 3:
+            lower, upper = _SQL_BETWEEN[function["IsBetween"]["closed"]]
+            operand = _sql_operand(inputs[0])
+            return f"(({operand} {lower} {_sql_operand(inputs[1])}) AND ({operand} {upper} {_sql_operand(inputs[2])}))"
+        if isinstance(function, dict) and "IsIn" in function and len(inputs) == 2:
+            if function["IsIn"].get("nulls_equal"):
+                raise _Untranslatable("is_in(nulls_equal=True)")
+            values = _literal_value(inputs[1])
+            if not isinstance(values, list):
+                raise _Untranslatable("is_in without a list")
+            values = [_sql_literal(v) for v in values if v is not None]
+            return f"({_sql_operand(inputs[0])} IN ({', '.join(values)}))" if values else "FALSE"
+    raise _Untranslatable(kind)
+
+
+def _conjuncts(node: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The operands of a chain of top-level ANDs (the node itself otherwise)."""
+    expr = node.get("BinaryExpr")
+    if expr is not None and expr.get("op") == "And":
+        return _conjuncts(expr["left"]) + _conjuncts(expr["right"])
+    return [node]
+
+
+def _sql_predicate(predicate: pl.Expr) -> Tuple[Optional[str], bool]:
+    """
+    Translates a Polars predicate into a DuckDB ``WHERE`` clause.
+
+    Covers comparisons of columns with columns or numeric, string, boolean,
+    date and datetime literals, combined with AND/OR/NOT, plus null tests,
+    ``is_between`` and ``is_in``. The predicate is read from its serialized
+    expression tree and split at its top-level ANDs, so the parts that
+    translate are pushed down even when others do not.
+
+    Returns the clause (None if nothing translated) and whether it covers the
+    whole predicate; if not, Polars must still apply the predicate.
+    """
+    try:
+        tree = json.loads(predicate.meta.serialize(format="json"))
+    except (pl.exceptions.PolarsError, ValueError):
+        return None, False
+    clauses, exact = [], True
+    for node in _conjuncts(tree):
+        try:
+            clauses.append(_sql_condition(node))
+        except (_Untranslatable, AttributeError, KeyError, TypeError, ValueError):
+            # Includes tree shapes a future Polars release may introduce
+            exact = False
+    return (" AND ".join(clauses) or None), exact
+
+
+def scan_table(db_path: Path, table: str, batch_size: int = BATCH_ROWS) -> pl.LazyFrame:
+    """
+    Lazily scans a DuckDB table.
+
+    Nothing is read until the LazyFrame is collected: the connection is opened at
+    collect time, projections become the ``SELECT`` list, filters a ``WHERE``
+    clause and ``head``/``limit`` a ``LIMIT``, so DuckDB only reads what is needed.
+    """
+    from polars.io.plugins import register_io_source
+
+    def schema() -> pl.Schema:
+        con = _connect(db_path)
+        try:
+            return pl.from_arrow(con.execute(f"SELECT * FROM {_quote(table)} LIMIT 0").fetch_arrow_table()).schema
+        finally:
+            con.close()
+
+    def source(
+        with_columns: Optional[List[str]],
+        predicate: Optional[pl.Expr],
+        n_rows: Optional[int],
+        batch_size_hint: Optional[int]
+    ) -> Iterator[pl.DataFrame]:
+        columns = ", ".join(_quote(c) for c in with_columns) if with_columns else "*"
+        sql = f"SELECT {columns} FROM {_quote(table)}"
+        where, exact = _sql_predicate(predicate) if predicate is not None else (None, True)
+        if where is not None:
+            sql += f" WHERE {where}"
+        post_filter = not exact
+        if n_rows is not None and not post_filter:
+            sql += f" LIMIT {n_rows}"
+
+        con = _connect(db_path)
+        try:
+            for batch in con.execute(sql).fetch_record_batch(batch_size_hint or batch_size):
+                df = pl.from_arrow(batch)
+                if post_filter:
+                    df = df.filter(predicate)
+                if n_rows is not None:
+                    df = df.head(n_rows)
+                    n_rows -= len(df)
+                if with_columns is not None and not with_columns:
+                    df = df.select([])
+                yield df
+                if n_rows == 0:
+                    break
+        finally:
+            con.close()
+
+    return register_io_source(source, schema=schema)
+
+
+def export_table(
+    db_path: Path,
+    table: str,
+    target_file: Path,
+    batch_size: int = BATCH_ROWS,
+    row_group_size: Optional[int] = None,
+    statistics: bool = True
+) -> int:
+    """
+    Streams a DuckDB table into a Parquet file one Arrow record batch at a time.
+
+    Memory stays bounded by ``batch_size`` regardless of table size. Returns the
+    number of rows written.
+    """
+    import pyarrow.parquet as pq
+
+    con = _connect(db_path)
+    rows = 0
+    try:
+        reader = record_batches(con, table, batch_size)
+        with pq.ParquetWriter(target_file, reader.schema, compression="zstd", write_statistics=statistics) as writer:
+            for batch in reader:
+                writer.write_batch(batch, row_group_size=row_group_size)
+                rows += batch.num_rows
+    finally:
+        con.close()
+    return rows
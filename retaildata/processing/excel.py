@@ -0,0 +1,106 @@
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import polars as pl
+from retaildata.config import settings
+
+
+def available_engine() -> Optional[str]:
+    """Returns the fastest installed Excel engine: calamine (fastexcel), then openpyxl."""
+    try:
+        import fastexcel  # noqa: F401
+        return "calamine"
+    except ImportError:
+        pass
+    try:
+        import openpyxl  # noqa: F401
+        return "openpyxl"
+    except ImportError:
+        return None
+
+
+def sheet_names(path: Path, engine: str) -> List[str]:
+    if engine == "calamine":
+        import fastexcel
+        return list(fastexcel.read_excel(path).sheet_names)
+    import openpyxl
+    workbook = openpyxl.load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def table_names(stem: str, sheets: List[str]) -> Dict[str, str]:
+    """
+    Prepared table names per sheet: the file stem alone for single-sheet
+    workbooks, ``<stem>_<sheet>`` otherwise. Sheets whose sanitized names
+    collide get a numeric suffix (``_2``, ``_3``...) instead of overwriting
+    each other.
+    """
+    if len(sheets) == 1:
+        return {sheets[0]: stem}
+    names: Dict[str, str] = {}
+    taken = set()
+    for sheet in sheets:
+        base = f"{stem}_{re.sub(r'[^0-9A-Za-z]+', '_', sheet).strip('_') or 'sheet'}"
+        name, n = base, 1
+        while name in taken:
+            n += 1
+            name = f"{base}_{n}"
+        taken.add(name)
+        names[sheet] = name
+    return names
+
+
+def _cache_dir(path: Path) -> Path:
+    stat = path.stat()
+    key = hashlib.sha256(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+    return settings.final_cache_dir / "excel" / key
+
+
+def _read_sheet(path: Path, sheet: str, engine: str) -> Optional[pl.DataFrame]:
+    df = pl.read_excel(path, sheet_name=sheet, engine=engine, raise_if_empty=False)
+    return df if df.width > 0 else None
+
+
+def read_workbook(path: Path, max_workers: Optional[int] = None, use_cache: Optional[bool] = None) -> Dict[str, pl.DataFrame]:
+    """
+    Reads every non-empty sheet of a workbook, parsing sheets in parallel threads.
+
+    Parsed sheets are cached as Parquet under ``<cache_dir>/excel/`` keyed by the
+    workbook's path, size and modification time, so ``inspect`` and prepare do
+    not parse the same workbook twice.
+    """
+    use_cache = settings.cache_enabled if use_cache is None else use_cache
+    cache_dir = _cache_dir(path)
+    index_path = cache_dir / "sheets.json"
+
+    if use_cache and index_path.exists():
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        return {sheet: pl.read_parquet(cache_dir / file) for sheet, file in index.items()}
+
+    engine = available_engine()
+    if engine is None:
+        # Let Polars pick whatever engine is installed (and raise a helpful error if none)
+        sheets = pl.read_excel(path, sheet_id=0)
+    else:
+        names = sheet_names(path, engine)
+        with ThreadPoolExecutor(max_workers=max_workers or min(len(names), 8) or 1) as executor:
+            frames = list(executor.map(lambda sheet: _read_sheet(path, sheet, engine), names))
+        sheets = {name: df for name, df in zip(names, frames) if df is not None}
+
+    if use_cache:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        index = {}
+        for i, (sheet, df) in enumerate(sheets.items()):
+            index[sheet] = f"{i}.parquet"
+            df.write_parquet(cache_dir / index[sheet])
+        with open(index_path, "w") as f:
+            json.dump(index, f, indent=2)
+
+    return sheets
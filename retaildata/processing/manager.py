@@ -1,26 +1,30 @@
+import os
+import shutil
+import time
 from pathlib import Path
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple, Union
 import polars as pl
 from retaildata.config import settings
 from retaildata.datasets.registry import Registry
+from retaildata.processing.sampling import sample_lazy, hash_split, stratified_sample
+from retaildata.processing.tasks import PrepareOptions, PrepareTask, PrepareResult, PREPARED_FORMATS
+from retaildata.processing.manifest import PreparedManifest
+from retaildata.processing.partition import add_date_parts, write_partitioned
+from retaildata.processing.duckdb_export import table_sizes, export_table
+from retaildata.processing.excel import read_workbook, table_names as excel_table_names
+from retaildata.processing.compaction import compact
+from retaildata.processing.schema import parse_dtype, csv_schema, INFER_SCHEMA_LENGTH
 from rich import print as rprint
+from rich.table import Table
 
 class ProcessingManager:
     def __init__(self):
         self.data_dir = settings.final_data_dir
-        self._dtype_map = {
-            "String": pl.String,
-            "Int64": pl.Int64,
-            "Float64": pl.Float64,
-            "Boolean": pl.Boolean,
-            "Date": pl.Date,
-            "Datetime": pl.Datetime
-        }
 
     def _get_pl_schema(self, schema_dict: Optional[Dict[str, str]]) -> Optional[Dict[str, Any]]:
         if not schema_dict:
             return None
-        return {k: self._dtype_map.get(v, pl.String) for k, v in schema_dict.items()}
+        return {k: parse_dtype(v, default=pl.String) for k, v in schema_dict.items()}
 
     def _get_path(self, dataset_id: str, subdir: str) -> Path:
         return self.data_dir / subdir / dataset_id
@@ -31,114 +35,455 @@ class ProcessingManager:
         data_dir: Optional[Path] = None, 
         sample_fraction: Optional[float] = None,
         stratify_col: Optional[str] = None,
-        split_fraction: Optional[float] = None
+        split_fraction: Optional[float] = None,
+        streaming: bool = False,
+        workers: Optional[int] = None,
+        force: bool = False,
+        partition_by: Optional[List[str]] = None,
+        partition_date_col: Optional[str] = None,
+        row_group_size: Optional[int] = None,
+        statistics: Union[bool, str] = True,
+        seed: int = 0,
+        split_key: Optional[List[str]] = None,
+        compact: bool = False,
+        prepared_format: str = "parquet",
+        ipc_compression: str = "uncompressed"
     ) -> bool:
         """
         Converts raw dataset files to Parquet format with optional sampling and splitting.
+
+        With ``streaming=True`` CSV files are scanned lazily and sunk straight to
+        Parquet, so memory stays bounded regardless of file size.
+
+        ``workers`` fans files (and DuckDB tables) out over a process pool;
+        defaults to ``settings.prepare_workers``, 0 means one per CPU.
+
+        Files whose raw checksum, options and library version match the
+        prepared manifest are skipped unless ``force=True``.
+
+        ``partition_by`` / ``partition_date_col`` write each table as a
+        Hive-partitioned directory (by column values and/or by year and month
+        of a date column); ``row_group_size`` and ``statistics`` tune the
+        Parquet row groups used for predicate pushdown.
+
+        Sampling (including stratified sampling) is reproducible for a given ``seed``.
+        Train/test splits hash the row position, or ``split_key`` columns so
+        that all rows of a group (e.g. a store) land on the same side.
+
+        ``compact=True`` stores low-cardinality strings as Enums and downcasts
+        numbers to the smallest safe width; the chosen dtypes are recorded in
+        the prepared manifest so ``load`` restores them.
+
+        ``prepared_format="ipc"`` (or ``"both"``) writes Arrow IPC/Feather files
+        that ``load`` memory-maps; ``ipc_compression`` is ``"uncompressed"`` or ``"lz4"``.
+
+        Returns True only if every file was prepared or already up to date; a
+        run where some files failed returns False.
+        """
+        results = self.prepare_dataset(
+            dataset_id,
+            data_dir=data_dir,
+            workers=workers,
+            force=force,
+            sample_fraction=sample_fraction,
+            stratify_col=stratify_col,
+            split_fraction=split_fraction,
+            streaming=streaming,
+            partition_by=partition_by,
+            partition_date_col=partition_date_col,
+            row_group_size=row_group_size,
+            statistics=statistics,
+            seed=seed,
+            split_key=split_key,
+            compact=compact,
+            prepared_format=prepared_format,
+            ipc_compression=ipc_compression
+        )
+        return bool(results) and all(r.ok for r in results)
+
+    def prepare_dataset(
+        self,
+        dataset_id: str,
+        data_dir: Optional[Path] = None,
+        workers: Optional[int] = None,
+        force: bool = False,
+        **options
+    ) -> Optional[List[PrepareResult]]:
+        """
+        ``process_dataset`` returning the per-file ``PrepareResult`` list instead of a flag.
+
+        ``options`` are the ``PrepareOptions`` fields. Returns None if the raw
+        data directory does not exist.
+        """
+        prepared_format = options.get("prepared_format", "parquet")
+        if prepared_format not in PREPARED_FORMATS:
+            raise ValueError(f"prepared_format must be one of {PREPARED_FORMATS}, got '{prepared_format}'")
+        results = self.prepare(dataset_id, data_dir=data_dir, options=PrepareOptions(**options), workers=workers, force=force)
+        if results is None:
+            return None
+
+        if not results:
+            rprint(f"[yellow]No suitable files found to process for {dataset_id}[/yellow]")
+            return results
+
+        self._report(results)
+        skipped = [r for r in results if r.skipped]
+        succeeded = [r for r in results if r.ok and not r.skipped]
+        failed = [r for r in results if not r.ok]
+        if skipped:
+            rprint(f"[dim]Skipped {len(skipped)} unchanged files for {dataset_id}[/dim]")
+        if succeeded:
+            rprint(f"[green]Successfully processed {len(succeeded)} files for {dataset_id}[/green]")
+        if failed:
+            rprint(f"[red]Failed to process {len(failed)} of {len(results)} files for {dataset_id}[/red]")
+        return results
+
+    def prepare(
+        self,
+        dataset_id: str,
+        data_dir: Optional[Path] = None,
+        options: Optional[PrepareOptions] = None,
+        workers: Optional[int] = None,
+        force: bool = False
+    ) -> Optional[List[PrepareResult]]:
+        """
+        Runs the prepare pipeline and returns one ``PrepareResult`` per file or table.
+
+        Returns None if the raw data directory does not exist.
         """
         base_dir = data_dir or self.data_dir
         raw_dir = base_dir / "raw" / dataset_id
         target_dir = base_dir / "prepared" / dataset_id
-        
+
         if not raw_dir.exists():
             rprint(f"[red]Raw data for {dataset_id} not found at {raw_dir}[/red]")
-            return False
+            return None
 
         target_dir.mkdir(parents=True, exist_ok=True)
-        
-        success = False
-        files_processed = 0
+        meta_dir = base_dir / "meta" / dataset_id
+        options = options or PrepareOptions()
+        # Resolved here: parallel workers are fresh processes without runtime-registered datasets
+        dataset = Registry.get(dataset_id)
+        schema = dataset.expected_schema if dataset else None
+        tasks, results = self._collect_tasks(dataset_id, raw_dir, target_dir, options, meta_dir)
+        for task in tasks:
+            task.expected_schema = schema
+
+        # Incremental prepare: skip tasks whose inputs are unchanged since the last run
+        manifest = PreparedManifest(meta_dir, raw_dir)
+        fingerprints = {}
+        todo = []
+        for task in tasks:
+            try:
+                fingerprints[manifest.key(task)] = manifest.fingerprint(task, schema)
+            except OSError as e:
+                results.append(PrepareResult(name=task.name, error=str(e)))
+                continue
+            task.checksum = fingerprints[manifest.key(task)]["checksum"]
+            if not force and manifest.is_current(task, fingerprints[manifest.key(task)]):
+                results.append(PrepareResult(name=task.name, outputs=manifest.outputs(task), dtypes=manifest.dtypes(task), skipped=True))
+            else:
+                todo.append(task)
+        tasks = todo
+
+        workers = settings.prepare_workers if workers is None else workers
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(tasks))
 
-        # Iterate over supported files
-        for file_path in raw_dir.rglob("*"):
-            if file_path.is_file():
+        if workers > 1:
+            from retaildata.processing.parallel import run_parallel, available_memory
+            available = available_memory()
+            budget = int(available * settings.prepare_memory_fraction) if available else None
+            rprint(f"Preparing {len(tasks)} files with {workers} workers...")
+            run_results = run_parallel(tasks, workers, memory_budget=budget)
+        else:
+            run_results = [self.run_task(task) for task in tasks]
+
+        by_name = {r.name: r for r in run_results}
+        for task in tasks:
+            result = by_name.get(task.name)
+            if result is not None and result.ok:
+                # Drop outputs of a previous run that the new options no longer produce
+                for stale in set(manifest.outputs(task)) - set(result.outputs):
+                    stale_path = target_dir / stale
+                    if stale_path.is_dir():
+                        shutil.rmtree(stale_path)
+                    else:
+                        stale_path.unlink(missing_ok=True)
+                manifest.record(task, fingerprints[manifest.key(task)], result.outputs, result.dtypes)
+            else:
+                manifest.forget(task)
+        manifest.save()
+
+        return results + run_results
+
+    def _collect_tasks(
+        self,
+        dataset_id: str,
+        raw_dir: Path,
+        target_dir: Path,
+        options: PrepareOptions,
+        meta_dir: Optional[Path] = None
+    ) -> Tuple[List[PrepareTask], List[PrepareResult]]:
+        """Expands the raw directory into prepare tasks; sources that cannot be opened become failed results."""
+        tasks = []
+        failures = []
+        for file_path in sorted(raw_dir.rglob("*")):
+            if not file_path.is_file():
+                continue
+            suffix = file_path.suffix.lower()
+            if suffix == ".csv":
+                tasks.append(PrepareTask(dataset_id, file_path, "csv", target_dir, options, meta_dir=meta_dir))
+            elif suffix in [".xls", ".xlsx"]:
+                tasks.append(PrepareTask(dataset_id, file_path, "excel", target_dir, options, meta_dir=meta_dir))
+            elif suffix == ".duckdb":
+                # One task per table, so large dlt tables can run side by side
                 try:
-                    df = None
-                    suffix = file_path.suffix.lower()
-                    
-                    if suffix == ".csv":
-                        rprint(f"Reading CSV: {file_path.name}")
-                        dataset = Registry.get(dataset_id)
-                        schema = self._get_pl_schema(dataset.expected_schema) if dataset else None
-                        df = pl.read_csv(
-                            file_path, 
-                            ignore_errors=True, 
-                            infer_schema_length=10000,
-                            schema_overrides=schema
-                        )
-                    elif suffix in [".xls", ".xlsx"]:
-                         rprint(f"Reading Excel: {file_path.name}")
-                         df = pl.read_excel(file_path)
-                    elif suffix == ".duckdb":
-                        rprint(f"Reading DuckDB: {file_path.name}")
-                        import duckdb
-                        con = duckdb.connect(str(file_path))
-                        tables = con.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'").fetchall()
-                        for (table_name,) in tables:
-                            if table_name.startswith("_dlt"): continue
-                            rprint(f"  Processing table: {table_name}")
-                            table_df = pl.read_database(f"SELECT * FROM {table_name}", connection=con)
-                            # recursion-like call or just process here
-                            self._process_dataframe(table_df, table_name, target_dir, sample_fraction, stratify_col, split_fraction)
-                            files_processed += 1
-                        con.close()
-                        continue # Skip the normal writing logic below for the .duckdb file itself
-                    
-                    if df is not None:
-                        self._process_dataframe(df, file_path.stem, target_dir, sample_fraction, stratify_col, split_fraction)
-                        files_processed += 1
-                        success = True
-                        
+                    tables = table_sizes(file_path)
                 except Exception as e:
-                    rprint(f"[red]Error processing {file_path.name}: {e}[/red]")
+                    failures.append(PrepareResult(name=file_path.name, error=str(e)))
+                    continue
+                for table_name, size in tables.items():
+                    tasks.append(PrepareTask(
+                        dataset_id, file_path, "duckdb", target_dir, options, table=table_name, meta_dir=meta_dir, size_hint=size
+                    ))
+        return tasks, failures
+
+    def run_task(self, task: PrepareTask) -> PrepareResult:
+        """Prepares a single file or DuckDB table, capturing any error in the result."""
+        started = time.perf_counter()
+        result = PrepareResult(name=task.name)
+        try:
+            written = self._convert(task)
+            result.outputs = list(written)
+            result.dtypes = {name: dtypes for name, dtypes in written.items() if dtypes}
+        except Exception as e:
+            rprint(f"[red]Error processing {task.name}: {e}[/red]")
+            result.error = str(e)
+        result.seconds = time.perf_counter() - started
+        return result
 
-        if files_processed > 0:
-            rprint(f"[green]Successfully processed {files_processed} files for {dataset_id}[/green]")
-            return True
+    def _convert(self, task: PrepareTask) -> Dict[str, Dict[str, Any]]:
+        """Converts a task's source and returns ``{output name: compacted dtypes}``."""
+        options = task.options
+        file_path = task.source
+
+        if task.kind == "csv":
+            overrides = self._get_pl_schema(task.expected_schema)
+            # Inferred once per raw checksum and persisted, so later scans skip inference
+            schema = csv_schema(file_path, task.meta_dir, task.checksum) if task.meta_dir else None
+            if schema is not None and overrides:
+                schema.update((col, dtype) for col, dtype in overrides.items() if col in schema)
+                overrides = None
+            if options.streaming:
+                rprint(f"Scanning CSV (streaming): {file_path.name}")
+                lf = pl.scan_csv(
+                    file_path,
+                    ignore_errors=True,
+                    infer_schema_length=INFER_SCHEMA_LENGTH,
+                    schema=schema,
+                    schema_overrides=overrides
+                )
+                return self._process_lazyframe(lf, task.stem, task.target_dir, options)
+            rprint(f"Reading CSV: {file_path.name}")
+            df = pl.read_csv(
+                file_path, 
+                ignore_errors=True, 
+                infer_schema_length=INFER_SCHEMA_LENGTH,
+                schema=schema,
+                schema_overrides=overrides
+            )
+        elif task.kind == "excel":
+            rprint(f"Reading Excel (all sheets): {file_path.name}")
+            sheets = read_workbook(file_path)
+            names = excel_table_names(task.stem, list(sheets))
+            outputs = {}
+            for sheet, df in sheets.items():
+                outputs.update(self._process_dataframe(df, names[sheet], task.target_dir, options))
+            return outputs
+        elif task.kind == "duckdb":
+            return self._convert_duckdb_table(task)
         else:
-            rprint(f"[yellow]No suitable files found to process for {dataset_id}[/yellow]")
-            return False
+            raise ValueError(f"Unsupported source kind '{task.kind}'")
+
+        return self._process_dataframe(df, task.stem, task.target_dir, options)
+
+    def _convert_duckdb_table(self, task: PrepareTask) -> Dict[str, Dict[str, Any]]:
+        """
+        Exports a DuckDB table through DuckDB's Arrow record-batch interface.
+
+        Without sampling, splitting or partitioning the batches go straight into
+        the final Parquet file; otherwise they are staged to Parquet and run
+        through the streaming pipeline. Memory stays bounded either way.
+        """
+        options = task.options
+        rprint(f"Exporting DuckDB table via Arrow: {task.name}")
+        passthrough = (
+            options.sample_fraction is None
+            and options.split_fraction is None
+            and not options.partition_by
+            and not options.partition_date_col
+            and not options.compact
+            and options.prepared_format == "parquet"
+        )
+        if passthrough:
+            target_file = task.target_dir / f"{task.stem}.parquet"
+            export_table(task.source, task.table, target_file, row_group_size=options.row_group_size, statistics=bool(options.statistics))
+            return {target_file.name: {}}
+
+        staging = task.target_dir / f".{task.stem}.staging.parquet"
+        try:
+            export_table(task.source, task.table, staging)
+            return self._process_lazyframe(pl.scan_parquet(staging), task.stem, task.target_dir, options)
+        finally:
+            staging.unlink(missing_ok=True)
+
+    def _report(self, results: List[PrepareResult]):
+        """Prints a per-file summary of a prepare run."""
+        table = Table(title="Prepare Summary")
+        table.add_column("Source", style="cyan")
+        table.add_column("Status")
+        table.add_column("Outputs")
+        table.add_column("Time", justify="right")
+        for r in results:
+            if r.skipped:
+                status = "[dim]Skipped (unchanged)[/dim]"
+            elif r.ok:
+                status = "[green]OK[/green]"
+            else:
+                status = f"[red]Failed: {r.error}[/red]"
+            table.add_row(r.name, status, ", ".join(r.outputs), f"{r.seconds:.1f}s")
+        rprint(table)
 
     def _process_dataframe(
         self, 
         df: pl.DataFrame, 
         stem: str, 
         target_dir: Path, 
-        sample_fraction: Optional[float] = None,
-        stratify_col: Optional[str] = None,
-        split_fraction: Optional[float] = None
-    ):
+        options: PrepareOptions
+    ) -> Dict[str, Dict[str, Any]]:
+        sample_fraction = options.sample_fraction
+        stratify_col = options.stratify_col
+        split_fraction = options.split_fraction
+
         # 1. Sampling / Stratified Sampling
         if sample_fraction is not None:
             rprint(f"Sampling {sample_fraction*100}% of data...")
             if stratify_col and stratify_col in df.columns:
                 rprint(f"Stratifying by: {stratify_col}")
-                # Grouped sampling to preserve distribution
-                df = df.group_by(stratify_col).map_groups(
-                    lambda group: group.sample(fraction=sample_fraction)
-                )
+                # Per-stratum sampling as a native window expression to preserve distribution
+                df = stratified_sample(df, stratify_col, sample_fraction, seed=options.seed)
             else:
-                df = df.sample(fraction=sample_fraction, shuffle=True)
+                df = df.sample(fraction=sample_fraction, shuffle=True, seed=options.seed)
 
-        # 2. Splitting
+        # 2. Compaction (before splitting, so train and test share the same dictionaries)
+        dtypes = {}
+        if options.compact:
+            df, dtypes = compact(df)
+            rprint(f"Compacted {len(dtypes)} columns")
+
+        # 3. Splitting
         if split_fraction is not None:
             rprint(f"Splitting into train/test (train={split_fraction*100}%)...")
-            # Shuffle first
-            df = df.sample(fraction=1.0, shuffle=True)
-            
-            train_size = int(len(df) * split_fraction)
-            df_train = df.slice(0, train_size)
-            df_test = df.slice(train_size)
-            
-            train_file = target_dir / f"{stem}_train.parquet"
-            test_file = target_dir / f"{stem}_test.parquet"
-            
-            df_train.write_parquet(train_file)
-            df_test.write_parquet(test_file)
-            rprint(f"Saved split files: {train_file.name}, {test_file.name}")
+            # Seeded hash split; each side is sunk from the in-memory frame without a shuffled copy
+            lf_train, lf_test = hash_split(df.lazy(), split_fraction, seed=options.seed + 1, key=options.split_key)
+
+            names = self._write(lf_train, target_dir, f"{stem}_train", options)
+            names += self._write(lf_test, target_dir, f"{stem}_test", options)
+            rprint(f"Saved split files: {', '.join(names)}")
+            return {name: dtypes for name in names}
         else:
-            target_file = target_dir / f"{stem}.parquet"
-            rprint(f"Writing Parquet: {target_file.name}")
-            df.write_parquet(target_file)
+            names = self._write(df, target_dir, stem, options)
+            rprint(f"Wrote: {', '.join(names)}")
+            return {name: dtypes for name in names}
+
+    def _process_lazyframe(
+        self,
+        lf: pl.LazyFrame,
+        stem: str,
+        target_dir: Path,
+        options: PrepareOptions
+    ) -> Dict[str, Dict[str, Any]]:
+        """Streaming counterpart of ``_process_dataframe`` that sinks to Parquet without collecting."""
+        sample_fraction = options.sample_fraction
+        stratify_col = options.stratify_col
+        split_fraction = options.split_fraction
+
+        # 1. Sampling (hash-based, so it runs as a streaming filter)
+        if sample_fraction is not None:
+            rprint(f"Sampling {sample_fraction*100}% of data (streaming)...")
+            if stratify_col and stratify_col in lf.collect_schema().names():
+                rprint(f"Stratifying by: {stratify_col}")
+                lf = stratified_sample(lf, stratify_col, sample_fraction, seed=options.seed)
+            else:
+                lf = sample_lazy(lf, sample_fraction, seed=options.seed)
+
+        # 2. Compaction (profiling costs up to two extra streaming passes over the source:
+        #    one aggregation, plus one collecting Enum dictionaries if any string column
+        #    qualifies; memory is bounded by the aggregates and those dictionaries)
+        dtypes = {}
+        if options.compact:
+            lf, dtypes = compact(lf)
+            rprint(f"Compacted {len(dtypes)} columns")
+
+        # 3. Splitting (hash-based, each side is sunk separately)
+        if split_fraction is not None:
+            rprint(f"Splitting into train/test (train={split_fraction*100}%, streaming)...")
+            lf_train, lf_test = hash_split(lf, split_fraction, seed=options.seed + 1, key=options.split_key)
+
+            names = self._write(lf_train, target_dir, f"{stem}_train", options)
+            names += self._write(lf_test, target_dir, f"{stem}_test", options)
+            rprint(f"Saved split files: {', '.join(names)}")
+            return {name: dtypes for name in names}
+        else:
+            names = self._write(lf, target_dir, stem, options)
+            rprint(f"Sank: {', '.join(names)}")
+            return {name: dtypes for name in names}
+
+    def _write(
+        self,
+        frame: Union[pl.DataFrame, pl.LazyFrame],
+        target_dir: Path,
+        name: str,
+        options: PrepareOptions
+    ) -> List[str]:
+        """
+        Writes ``<name>.parquet`` and/or ``<name>.arrow`` (per ``prepared_format``), or a
+        Hive-partitioned ``<name>/`` Parquet directory when partitioning is requested.
+        Returns the output names relative to ``target_dir``.
+        """
+        keys = list(options.partition_by or [])
+        sort_by = None
+        if options.partition_date_col:
+            lf, date_keys = add_date_parts(frame.lazy(), options.partition_date_col)
+            frame = lf.collect() if isinstance(frame, pl.DataFrame) else lf
+            keys = date_keys + keys
+            sort_by = options.partition_date_col
+
+        if keys:
+            out_dir = target_dir / name
+            write_partitioned(frame, out_dir, keys, options.row_group_size, options.statistics, sort_by=sort_by)
+            return [out_dir.name]
+
+        written = []
+        if options.prepared_format in ("parquet", "both"):
+            target_file = target_dir / f"{name}.parquet"
+            if isinstance(frame, pl.LazyFrame):
+                frame.sink_parquet(target_file, row_group_size=options.row_group_size, statistics=options.statistics)
+            else:
+                frame.write_parquet(target_file, row_group_size=options.row_group_size, statistics=options.statistics)
+            written.append(target_file.name)
+            # Derive the IPC copy from the Parquet file instead of evaluating the pipeline twice
+            frame = pl.scan_parquet(target_file)
+
+        if options.prepared_format in ("ipc", "both"):
+            target_file = target_dir / f"{name}.arrow"
+            if isinstance(frame, pl.LazyFrame):
+                frame.sink_ipc(target_file, compression=options.ipc_compression)
+            else:
+                frame.write_ipc(target_file, compression=options.ipc_compression)
+            written.append(target_file.name)
+        return written
 
 manager = ProcessingManager()
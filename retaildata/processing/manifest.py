@@ -0,0 +1,104 @@
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from retaildata.postprocess.metadata import MetadataManager
+from retaildata.processing.tasks import PrepareTask
+
+
+# Extensions of single-file prepared outputs; partitioned outputs are directories.
+_OUTPUT_EXTENSIONS = (".parquet", ".arrow")
+
+
+def table_key(output: str) -> str:
+    """The ``load`` key of a prepared output name (``sales_train.parquet`` -> ``sales_train``)."""
+    for ext in _OUTPUT_EXTENSIONS:
+        if output.endswith(ext):
+            return output[:-len(ext)]
+    return output
+
+
+class PreparedManifest:
+    """
+    Records which raw checksum, options and library versions produced each prepared file.
+
+    Stored at ``meta/<id>/prepared_manifest.json`` and keyed by the source path
+    relative to the raw directory (``<file>:<table>`` for DuckDB tables).
+    """
+
+    def __init__(self, meta_dir: Path, raw_dir: Path):
+        self.path = meta_dir / "prepared_manifest.json"
+        self.raw_dir = raw_dir
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._checksums: Dict[str, str] = {}
+
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                self.entries = json.load(f)
+
+        checksums_path = meta_dir / "checksums.json"
+        if checksums_path.exists():
+            with open(checksums_path, "r") as f:
+                self._checksums = json.load(f)
+
+    def key(self, task: PrepareTask) -> str:
+        rel_path = task.source.relative_to(self.raw_dir).as_posix()
+        return f"{rel_path}:{task.table}" if task.table else rel_path
+
+    def checksum(self, source: Path) -> str:
+        """Checksum of a raw file, taken from the provider's checksums.json when available."""
+        rel_path = str(source.relative_to(self.raw_dir))
+        if rel_path not in self._checksums:
+            self._checksums[rel_path] = MetadataManager.calculate_checksum(source)
+        return self._checksums[rel_path]
+
+    def fingerprint(self, task: PrepareTask, schema: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        import polars as pl
+        from retaildata import __version__
+
+        return {
+            "checksum": self.checksum(task.source),
+            "options": asdict(task.options),
+            "schema": schema,
+            "version": __version__,
+            # Seeded samples and splits hash with Expr.hash, which is stable only within one Polars version
+            "polars_version": pl.__version__,
+        }
+
+    def is_current(self, task: PrepareTask, fingerprint: Dict[str, Any]) -> bool:
+        """True if the task's outputs exist and were produced from identical inputs."""
+        entry = self.entries.get(self.key(task))
+        if not entry or entry.get("inputs") != fingerprint:
+            return False
+        return all((task.target_dir / name).exists() for name in entry.get("outputs", []))
+
+    def outputs(self, task: PrepareTask) -> List[str]:
+        return self.entries.get(self.key(task), {}).get("outputs", [])
+
+    def dtypes(self, task: PrepareTask) -> Dict[str, Dict[str, Any]]:
+        return self.entries.get(self.key(task), {}).get("dtypes", {})
+
+    def record(self, task: PrepareTask, fingerprint: Dict[str, Any], outputs: List[str], dtypes: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.entries[self.key(task)] = {"inputs": fingerprint, "outputs": outputs, "dtypes": dtypes or {}}
+
+    def forget(self, task: PrepareTask):
+        self.entries.pop(self.key(task), None)
+
+    @staticmethod
+    def recorded_dtypes(meta_dir: Path) -> Dict[str, Dict[str, Any]]:
+        """Compacted dtypes per prepared table key (output name without extension), for ``load``."""
+        path = meta_dir / "prepared_manifest.json"
+        if not path.exists():
+            return {}
+        with open(path, "r") as f:
+            entries = json.load(f)
+        tables = {}
+        for entry in entries.values():
+            for output, dtypes in entry.get("dtypes", {}).items():
+                tables[table_key(output)] = dtypes
+        return tables
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=2)
@@ -0,0 +1,92 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional
+from retaildata.processing.tasks import PrepareTask, PrepareResult
+
+# Rough peak-memory multipliers relative to the on-disk size of a source
+# (for DuckDB tables, relative to the table's estimated in-memory size).
+_MEMORY_FACTORS = {"csv": 4.0, "excel": 10.0, "duckdb": 2.0}
+# Streaming scans keep a bounded working set no matter how big the file is.
+_STREAMING_PEAK = 512 * 1024**2
+
+
+def available_memory() -> Optional[int]:
+    """Returns the memory (in bytes) currently available to new processes, if it can be determined."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def estimate_memory(task: PrepareTask) -> int:
+    """Estimates the peak memory needed to prepare a task."""
+    # A DuckDB file holds many tables, each prepared by its own task: size them separately
+    size = task.size_hint if task.kind == "duckdb" and task.size_hint is not None else task.source.stat().st_size
+    if task.options.streaming and task.kind == "csv":
+        return min(size, _STREAMING_PEAK)
+    return int(size * _MEMORY_FACTORS.get(task.kind, 4.0))
+
+
+def limit_native_threads(threads: int):
+    """
+    Caps the native thread pools (Polars, BLAS) of the current process.
+
+    Used as a process-pool initializer so that N workers do not each spin up
+    one thread per core.
+    """
+    for var in ("POLARS_MAX_THREADS", "OMP_NUM_THREADS"):
+        os.environ.setdefault(var, str(threads))
+
+
+def _run_task(task: PrepareTask) -> PrepareResult:
+    # Imported here so the worker's thread limit is in place before polars loads.
+    from retaildata.processing.manager import manager
+    return manager.run_task(task)
+
+
+def run_parallel(tasks: List[PrepareTask], workers: int, memory_budget: Optional[int] = None) -> List[PrepareResult]:
+    """
+    Runs prepare tasks on a process pool.
+
+    Tasks are admitted largest first, and only while the sum of their estimated
+    peak memory fits within ``memory_budget``; at least one task always runs.
+    """
+    estimates: Dict[int, int] = {id(t): estimate_memory(t) for t in tasks}
+    pending = sorted(tasks, key=lambda t: estimates[id(t)], reverse=True)
+    running = {}
+    results: List[PrepareResult] = []
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    ctx = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=limit_native_threads, initargs=(threads,)) as pool:
+        while pending or running:
+            while pending and len(running) < workers:
+                in_use = sum(est for _, est in running.values())
+                task = next(
+                    (t for t in pending if memory_budget is None or not running or in_use + estimates[id(t)] <= memory_budget),
+                    None
+                )
+                if task is None:
+                    break
+                pending.remove(task)
+                running[pool.submit(_run_task, task)] = (task, estimates[id(task)])
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, _ = running.pop(future)
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # e.g. BrokenProcessPool when a worker gets OOM-killed
+                    results.append(PrepareResult(name=task.name, error=str(e) or type(e).__name__))
+
+    return results
@@ -0,0 +1,101 @@
+from typing import List, Optional, Tuple, TypeVar
+import polars as pl
+
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+# Temporary column used to give every row a stable position before hashing.
+ROW_INDEX_COL = "__retaildata_row_nr"
+
+# Resolution of the hash buckets used to turn a fraction into a threshold.
+# Polars guarantees ``Expr.hash`` only within one Polars version, so a seed
+# reproduces the same sample or split only on the same Polars version.
+_BUCKETS = 1_000_000
+
+
+def _bucket(expr: pl.Expr, seed: int) -> pl.Expr:
+    """Seeded hash of ``expr`` mapped onto ``[0, _BUCKETS)``."""
+    return expr.hash(seed) % _BUCKETS
+
+
+def _hash_below(expr: pl.Expr, fraction: float, seed: int) -> pl.Expr:
+    """Boolean expression that is True for roughly ``fraction`` of all hashed values."""
+    return _bucket(expr, seed) < int(fraction * _BUCKETS)
+
+
+def sample_lazy(lf: pl.LazyFrame, fraction: float, seed: int = 0) -> pl.LazyFrame:
+    """
+    Bernoulli-samples a LazyFrame by hashing the row position.
+
+    Runs as a plain filter, so it works inside the streaming engine.
+    """
+    return (
+        lf.with_row_index(ROW_INDEX_COL)
+        .filter(_hash_below(pl.col(ROW_INDEX_COL), fraction, seed))
+        .drop(ROW_INDEX_COL)
+    )
+
+
+def stratified_sample(frame: FrameT, stratify_col: str, fraction: float, seed: int = 0) -> FrameT:
+    """
+    Samples ``fraction`` of the rows of every stratum of ``stratify_col``.
+
+    DataFrames: rows are ranked within their stratum by a seeded hash of their
+    position and the lowest ``floor(fraction * stratum_size)`` are kept. This
+    is a single window expression, so no per-group Python callback runs.
+
+    LazyFrames: a window over the whole table cannot stream, so the strata are
+    counted first (one streaming ``group_by`` pass) and every row is kept when
+    its seeded hash falls below its stratum's ``floor(fraction * n) / n``
+    threshold. Each stratum then keeps ``floor(fraction * n)`` rows in
+    expectation rather than exactly, and the sample streams as a plain filter.
+    Both variants are reproducible for a given seed.
+    """
+    if isinstance(frame, pl.LazyFrame):
+        return _stratified_sample_lazy(frame, stratify_col, fraction, seed)
+    rank = pl.col(ROW_INDEX_COL).hash(seed).rank("ordinal").over(stratify_col)
+    quota = (pl.len().over(stratify_col) * fraction).floor()
+    return (
+        frame.with_row_index(ROW_INDEX_COL)
+        .filter(rank <= quota)
+        .drop(ROW_INDEX_COL)
+    )
+
+
+def _stratified_sample_lazy(lf: pl.LazyFrame, stratify_col: str, fraction: float, seed: int) -> pl.LazyFrame:
+    counts = lf.group_by(stratify_col).agg(pl.len().alias("n")).collect(engine="streaming")
+    thresholds = (counts["n"] * fraction).floor() / counts["n"] * _BUCKETS
+    threshold = pl.col(stratify_col).replace_strict(counts[stratify_col], thresholds, return_dtype=pl.Float64)
+    return (
+        lf.with_row_index(ROW_INDEX_COL)
+        .filter(_bucket(pl.col(ROW_INDEX_COL), seed) < threshold)
+        .drop(ROW_INDEX_COL)
+    )
+
+
+def hash_split(
+    frame: FrameT,
+    fraction: float,
+    seed: int = 0,
+    key: Optional[List[str]] = None
+) -> Tuple[FrameT, FrameT]:
+    """
+    Splits a frame into (train, test) by hashing a key with a seed.
+
+    Without ``key`` every row is assigned independently by its position. With
+    ``key`` (e.g. ``["store_nbr"]``) all rows sharing the key land on the same
+    side. Both sides are plain filters over the input, so no shuffled copy is
+    built and LazyFrames can be sunk side by side. The train share is
+    ``fraction`` in expectation rather than exactly.
+    """
+    if key:
+        bucket = pl.struct(key) if len(key) > 1 else pl.col(key[0])
+        indexed = frame
+    else:
+        bucket = pl.col(ROW_INDEX_COL)
+        indexed = frame.with_row_index(ROW_INDEX_COL)
+
+    in_train = _hash_below(bucket, fraction, seed)
+    train, test = indexed.filter(in_train), indexed.filter(~in_train)
+    if not key:
+        train, test = train.drop(ROW_INDEX_COL), test.drop(ROW_INDEX_COL)
+    return train, test
@@ -0,0 +1,114 @@
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+import polars as pl
+
+# Dtype names accepted in ``expected_schema`` and in persisted schemas.
+DTYPES = {
+    "String": pl.String,
+    "Utf8": pl.String,
+    "Int8": pl.Int8,
+    "Int16": pl.Int16,
+    "Int32": pl.Int32,
+    "Int64": pl.Int64,
+    "UInt8": pl.UInt8,
+    "UInt16": pl.UInt16,
+    "UInt32": pl.UInt32,
+    "UInt64": pl.UInt64,
+    "Float32": pl.Float32,
+    "Float64": pl.Float64,
+    "Boolean": pl.Boolean,
+    "Date": pl.Date,
+    "Time": pl.Time,
+    "Datetime": pl.Datetime,
+    "Duration": pl.Duration,
+    "Categorical": pl.Categorical,
+    "Binary": pl.Binary,
+    "Null": pl.Null,
+}
+
+# Datetime("us", "UTC") as printed by Polars, or the short Datetime[us, UTC] / Datetime[UTC]
+_PARAMETRIZED = re.compile(r"^(Datetime|Duration|Decimal)\s*[\(\[](.*)[\)\]]$")
+_TIME_UNITS = {"ns", "us", "ms"}
+
+# Rows used to infer a CSV schema the first time a raw file is seen.
+INFER_SCHEMA_LENGTH = 10000
+
+
+def parse_dtype(name: str, default: Any = None) -> Any:
+    """
+    Parses a dtype name into a Polars dtype.
+
+    Besides the plain names in ``DTYPES`` this understands parametrized types
+    such as ``Datetime(time_unit='ms', time_zone='UTC')``,
+    ``Datetime[ms, Europe/Berlin]``, ``Duration[ms]`` and ``Decimal(10, 2)``.
+    Unknown names return ``default`` or raise ``ValueError`` when no default is given.
+    """
+    name = name.strip()
+    if name in DTYPES:
+        return DTYPES[name]
+
+    match = _PARAMETRIZED.match(name)
+    if match:
+        kind, args = match.groups()
+        values = [a.split("=", 1)[-1].strip().strip("'\"") for a in args.split(",") if a.strip()]
+        values = [None if v == "None" else v for v in values]
+        if kind == "Decimal":
+            precision, scale = (int(v) if v is not None else None for v in values)
+            return pl.Decimal(precision, scale)
+        unit = next((v for v in values if v in _TIME_UNITS), "us")
+        if kind == "Duration":
+            return pl.Duration(unit)
+        zone = next((v for v in values if v is not None and v not in _TIME_UNITS), None)
+        return pl.Datetime(unit, zone)
+
+    if default is not None:
+        return default
+    raise ValueError(f"Unknown dtype '{name}'")
+
+
+def dtype_to_json(dtype: Any) -> Any:
+    """Serializes a Polars dtype for metadata files; Enums keep their categories."""
+    if isinstance(dtype, pl.Enum):
+        return {"Enum": dtype.categories.to_list()}
+    return str(dtype)
+
+
+def dtype_from_json(value: Any) -> Any:
+    """Inverse of ``dtype_to_json``."""
+    if isinstance(value, dict) and "Enum" in value:
+        return pl.Enum(value["Enum"])
+    return parse_dtype(value)
+
+
+def cast_to(frame: Any, dtypes: Dict[str, Any]) -> Any:
+    """Casts the columns of a DataFrame/LazyFrame that are present to recorded dtypes."""
+    names = frame.collect_schema().names()
+    casts = [pl.col(col).cast(dtype_from_json(dtype)) for col, dtype in dtypes.items() if col in names]
+    return frame.with_columns(casts) if casts else frame
+
+
+def csv_schema(path: Path, meta_dir: Path, checksum: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns the inferred schema of a CSV file, inferring it only once per raw checksum.
+
+    Schemas are persisted as ``meta/<id>/schemas/<checksum>.json``. Being keyed by
+    content, entries never go stale and parallel prepare workers never write the
+    same file. Without a checksum the schema is inferred and not persisted.
+    """
+    cache_file = meta_dir / "schemas" / f"{checksum}.json" if checksum else None
+    if cache_file is not None and cache_file.exists():
+        with open(cache_file, "r") as f:
+            return {col: dtype_from_json(dtype) for col, dtype in json.load(f)["schema"].items()}
+
+    schema = dict(pl.scan_csv(path, infer_schema_length=INFER_SCHEMA_LENGTH).collect_schema())
+
+    if cache_file is not None:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{checksum}.{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"source": path.name, "schema": {col: dtype_to_json(dtype) for col, dtype in schema.items()}}, f, indent=2)
+        tmp_file.replace(cache_file)
+    return schema
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# Prepared file formats: Parquet, Arrow IPC/Feather (memory-mapped by ``load``), or both.
+PREPARED_FORMATS = ("parquet", "ipc", "both")
+
+
+@dataclass
+class PrepareOptions:
+    """Options shared by every file of a prepare run."""
+    sample_fraction: Optional[float] = None
+    stratify_col: Optional[str] = None
+    split_fraction: Optional[float] = None
+    streaming: bool = False
+    partition_by: Optional[List[str]] = None  # Hive partition columns
+    partition_date_col: Optional[str] = None  # partition by year/month of this column
+    row_group_size: Optional[int] = None
+    statistics: Union[bool, str] = True  # Parquet column statistics ('full' adds distinct counts)
+    seed: int = 0  # seed for sampling and splitting
+    split_key: Optional[List[str]] = None  # group columns kept together by the split
+    compact: bool = False  # Enum-encode low-cardinality strings, downcast numbers
+    prepared_format: str = "parquet"  # 'parquet', 'ipc' (Arrow IPC/Feather) or 'both'
+    ipc_compression: str = "uncompressed"  # 'uncompressed' (memory-mappable) or 'lz4'
+
+
+@dataclass
+class PrepareTask:
+    """One unit of prepare work: a raw file, or a single table inside a DuckDB file."""
+    dataset_id: str
+    source: Path
+    kind: str  # 'csv', 'excel', 'duckdb'
+    target_dir: Path
+    options: PrepareOptions
+    table: Optional[str] = None
+    meta_dir: Optional[Path] = None  # meta/<id>/, home of the persisted schema cache
+    checksum: Optional[str] = None  # raw file checksum, filled in by the manifest
+    expected_schema: Optional[Dict[str, str]] = None  # dtype overrides, resolved from the registry by the parent process
+    size_hint: Optional[int] = None  # estimated in-memory bytes of a DuckDB table
+
+    @property
+    def name(self) -> str:
+        return f"{self.source.name}:{self.table}" if self.table else self.source.name
+
+    @property
+    def stem(self) -> str:
+        return self.table or self.source.stem
+
+
+@dataclass
+class PrepareResult:
+    """Outcome of a single ``PrepareTask``."""
+    name: str
+    outputs: List[str] = field(default_factory=list)
+    dtypes: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # compacted dtypes per output
+    error: Optional[str] = None
+    seconds: float = 0.0
+    skipped: bool = False  # outputs were already up to date
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from pathlib import Path
 from retaildata.datasets.registry import Dataset
@@ -16,6 +17,13 @@ class BaseProvider(ABC):
         """
         pass
 
+    async def adownload(self, dataset: Dataset, destination: Path, meta_dir: Path, **kwargs):
+        """
+        Async ``download``. Providers built on blocking SDKs run ``download`` in a
+        worker thread so that the event loop can overlap other datasets.
+        """
+        await asyncio.to_thread(self.download, dataset, destination, meta_dir, **kwargs)
+
     def prepare(self, dataset: Dataset, source_dir: Path, target_dir: Path, **kwargs):
         """
         Optional step to prepare/normalize the dataset structure.
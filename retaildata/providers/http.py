@@ -1,25 +1,51 @@
+import asyncio
 from pathlib import Path
+from typing import List, Optional
 import httpx
 from tqdm import tqdm
+from retaildata.config import settings
 from retaildata.datasets.registry import Dataset
 from retaildata.providers.base import BaseProvider
 from retaildata.postprocess.metadata import MetadataManager
+from retaildata.utils.download import VALIDATORS_FILE, DownloadResult, fetch_segmented, load_validators, save_validators
 
 class HTTPProvider(BaseProvider):
-    def download(self, dataset: Dataset, destination: Path, meta_dir: Path, **kwargs):
+    def download(
+        self,
+        dataset: Dataset,
+        destination: Path,
+        meta_dir: Path,
+        segments: Optional[int] = None,
+        segment_size: Optional[int] = None,
+        cache: bool = True,
+        **kwargs
+    ):
         """
         Downloads one or more files from URLs using httpx.
+
+        A single large file is fetched as ``segments`` parallel byte ranges of
+        ``segment_size`` bytes when the server supports it (defaults from settings).
+        With ``cache``, files already on disk are only re-fetched if the server
+        reports a change against the ETag/Last-Modified of the last download.
         """
         if not dataset.url and not dataset.urls:
             raise ValueError(f"Dataset {dataset.id} does not have any URLs defined for HTTP provider.")
 
         destination.mkdir(parents=True, exist_ok=True)
+        validators_path = meta_dir / dataset.id / VALIDATORS_FILE
+        validators = load_validators(validators_path) if cache else {}
         
         source_url = ""
         if dataset.urls:
             from retaildata.utils.parallel import parallel_downloader
             print(f"Downloading multiple files for {dataset.id} in parallel...")
-            parallel_downloader.download_many(dataset.urls, destination)
+            try:
+                results = parallel_downloader.download_many(
+                    dataset.urls, destination, checksums=dataset.checksums, validators=validators
+                )
+            finally:
+                save_validators(validators_path, validators)
+            self._raise_failed(dataset, results)
             source_url = ", ".join(dataset.urls)
         else:
             url = dataset.url
@@ -30,26 +56,86 @@ class HTTPProvider(BaseProvider):
             print(f"Downloading {dataset.id} from {url}...")
             
             try:
-                with httpx.stream("GET", url, follow_redirects=True) as response:
-                    response.raise_for_status()
-                    total = int(response.headers.get("content-length", 0))
+                with httpx.Client(timeout=60.0) as client, tqdm(
+                    desc=filename,
+                    unit="iB",
+                    unit_scale=True,
+                    unit_divisor=1024,
+                ) as progress_bar:
+                    def on_start(total, offset):
+                        progress_bar.reset(total=total)
+                        progress_bar.update(offset)
 
-                    with open(file_path, "wb") as f, tqdm(
-                        desc=filename,
-                        total=total,
-                        unit="iB",
-                        unit_scale=True,
-                        unit_divisor=1024,
-                    ) as progress_bar:
-                        for chunk in response.iter_bytes():
-                            size = f.write(chunk)
-                            progress_bar.update(size)
+                    result = fetch_segmented(
+                        url,
+                        file_path,
+                        client,
+                        segments=segments or settings.download_segments,
+                        segment_size=segment_size or settings.download_segment_size,
+                        sha256=(dataset.checksums or {}).get(filename),
+                        progress=progress_bar.update,
+                        on_start=on_start,
+                        validators=validators,
+                    )
                 
-                print(f"Download complete: {file_path}")
+                print(f"Not modified, kept {file_path}" if result.not_modified else f"Download complete: {file_path}")
+                results = [result]
             except Exception as e:
                 print(f"Error downloading {dataset.id}: {e}")
                 raise
+            finally:
+                save_validators(validators_path, validators)
+
+        self._save_metadata(dataset, destination, meta_dir, source_url, results)
+
+    async def adownload(
+        self,
+        dataset: Dataset,
+        destination: Path,
+        meta_dir: Path,
+        segments: Optional[int] = None,
+        segment_size: Optional[int] = None,
+        cache: bool = True,
+        **kwargs
+    ):
+        """
+        Downloads a dataset without blocking the running event loop.
+
+        Multi-file datasets stream through the async ``ParallelDownloader``; hashing
+        for checksums.json runs in a worker thread. A single-file dataset is fetched
+        as in ``download`` (segmented by ``segments``/``segment_size``) in a worker
+        thread. Unchanged files are skipped as in ``download``.
+        """
+        if not dataset.urls:
+            await asyncio.to_thread(
+                self.download, dataset, destination, meta_dir, segments=segments, segment_size=segment_size, cache=cache
+            )
+            return
+
+        from retaildata.utils.parallel import parallel_downloader
+
+        validators_path = meta_dir / dataset.id / VALIDATORS_FILE
+        validators = load_validators(validators_path) if cache else {}
+        print(f"Downloading {dataset.id} ({len(dataset.urls)} file(s), async)...")
+        try:
+            results = await parallel_downloader.adownload_many(
+                dataset.urls, destination, checksums=dataset.checksums, validators=validators, progress=False
+            )
+        finally:
+            save_validators(validators_path, validators)
+        self._raise_failed(dataset, results)
+
+        await asyncio.to_thread(self._save_metadata, dataset, destination, meta_dir, ", ".join(dataset.urls), results)
+
+    def _raise_failed(self, dataset: Dataset, results: List[DownloadResult]):
+        failed = [result for result in results if not result.ok]
+        if failed:
+            details = "; ".join(f"{result.path.name}: {result.error}" for result in failed)
+            raise RuntimeError(f"Failed to download {len(failed)} file(s) of {dataset.id}: {details}")
 
+    def _save_metadata(
+        self, dataset: Dataset, destination: Path, meta_dir: Path, source_url: str, results: List[DownloadResult]
+    ):
         try:
             # Save metadata
             MetadataManager.save_metadata(
@@ -61,7 +147,9 @@ class HTTPProvider(BaseProvider):
             
             # Save checksums
             checksums_path = meta_dir / dataset.id / "checksums.json"
-            MetadataManager.save_checksums(destination, checksums_path)
+            # Downloaded files were hashed while streaming; only other files are read again
+            known = {str(r.path.relative_to(destination)): r.sha256 for r in results if r.sha256}
+            MetadataManager.save_checksums(destination, checksums_path, known=known)
             
         except Exception as e:
             print(f"An error occurred while saving metadata: {e}")
@@ -0,0 +1,496 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set
+import httpx
+
+PART_SUFFIX = ".part"
+# Attempts after the first one; each resumes from the bytes already on disk
+MAX_RETRIES = 3
+# Seconds to wait before the n-th retry is RETRY_BACKOFF * n
+RETRY_BACKOFF = 1.0
+# Block size for reading back partial files into the digest, and for async writes
+CHUNK_SIZE = 1024**2
+# Ranges are byte offsets into the encoded body, so ask for it unencoded
+HEADERS = {"Accept-Encoding": "identity"}
+# Per-URL ETag/Last-Modified/Content-Length of the last download, in meta/<id>/
+VALIDATORS_FILE = "validators.json"
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of downloading one URL."""
+    url: str
+    path: Path
+    not_modified: bool = False  # the server answered 304 and the existing file was kept
+    bytes: int = 0  # body bytes received over all attempts
+    seconds: float = 0.0
+    retries: int = 0
+    error: Optional[str] = None
+    sha256: Optional[str] = None  # digest of the file, computed from the stream as it was written
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def _stop(self, started: float) -> "DownloadResult":
+        self.seconds = time.perf_counter() - started
+        return self
+
+
+class IncompleteDownloadError(IOError):
+    """The server closed the transfer before the announced number of bytes arrived."""
+
+
+class RangeNotSupportedError(IOError):
+    """The server answered a byte-range request with something other than that range."""
+
+
+class _StreamHash:
+    """
+    SHA256 of a ``.part`` file fed by the download stream. Bytes already on disk
+    that the stream did not deliver (a resumed prefix) are read back once.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def resume(self, part: Path, offset: int):
+        """Positions the digest at ``offset``: restarts if the stream restarted, reads any unseen prefix."""
+        if offset < self.size:
+            self._hash, self.size = hashlib.sha256(), 0
+        if offset > self.size:
+            with open(part, "rb") as f:
+                f.seek(self.size)
+                while self.size < offset:
+                    block = f.read(min(CHUNK_SIZE, offset - self.size))
+                    if not block:
+                        break
+                    self.update(block)
+
+    def update(self, chunk: bytes):
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def part_path(file_path: Path) -> Path:
+    """The partial file ``file_path`` is streamed into before it is complete."""
+    return file_path.with_name(file_path.name + PART_SUFFIX)
+
+
+def ranges_path(file_path: Path) -> Path:
+    """Records which ranges of a segmented ``.part`` file are complete."""
+    return file_path.with_name(file_path.name + ".ranges" + PART_SUFFIX)
+
+
+def _discard_segmented(file_path: Path):
+    """Drops a preallocated (hence full-size but holey) partial file a sequential download must not resume."""
+    ranges = ranges_path(file_path)
+    if ranges.exists():
+        part_path(file_path).unlink(missing_ok=True)
+        ranges.unlink()
+
+
+def load_validators(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Validators saved by earlier downloads, keyed by URL (empty if there are none)."""
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_validators(path: Path, validators: Dict[str, Dict[str, Any]]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(validators, indent=2, sort_keys=True))
+
+
+def _conditional_headers(validators: Optional[Dict[str, Dict[str, Any]]], url: str, file_path: Path) -> Dict[str, str]:
+    """
+    ``If-None-Match``/``If-Modified-Since`` for ``url``, only while the file they
+    describe is still on disk with the recorded length.
+    """
+    validator = (validators or {}).get(url)
+    if not validator or not file_path.is_file():
+        return {}
+    if validator.get("content_length") is not None and file_path.stat().st_size != validator["content_length"]:
+        return {}
+    headers = {}
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    if validator.get("last_modified"):
+        headers["If-Modified-Since"] = validator["last_modified"]
+    return headers
+
+
+def _remember(
+    validators: Optional[Dict[str, Dict[str, Any]]], url: str, response: httpx.Response, file_path: Path, digest: str
+):
+    """Records the validators (and digest) of a completed download of ``url``, or forgets them if it sent none."""
+    if validators is None:
+        return
+    etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+    if etag or last_modified:
+        validators[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_length": file_path.stat().st_size,
+            "sha256": digest,
+        }
+    else:
+        validators.pop(url, None)
+
+
+def _request_headers(offset: int, conditional: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    if offset:
+        return {**HEADERS, "Range": f"bytes={offset}-"}
+    return {**HEADERS, **(conditional or {})}
+
+
+def _total_size(response: httpx.Response, offset: int) -> Optional[int]:
+    """Full size of the file from ``Content-Range`` (206) or ``Content-Length`` (200), if announced."""
+    if response.status_code == 206:
+        total = response.headers.get("content-range", "").rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("content-length")
+    return int(length) if length is not None else None
+
+
+def _start(response: httpx.Response, part: Path, offset: int) -> Optional[int]:
+    """
+    Checks a response and returns the offset it continues from: ``offset`` for a
+    206 answer to our Range, 0 when the server ignored the Range and resends all,
+    None when the partial file already holds the whole file.
+    """
+    if response.status_code == 416 and offset:
+        if response.headers.get("content-range", "") == f"bytes */{offset}":
+            return None
+        # The partial file is longer than the remote one (e.g. it changed); start over
+        part.unlink()
+        raise IncompleteDownloadError(f"{response.url}: stale partial file discarded")
+    response.raise_for_status()
+    if response.status_code != 206:
+        return 0
+    return offset
+
+
+def _finish(part: Path, file_path: Path, total: Optional[int], sha256: Optional[str], digest: str) -> Path:
+    """Renames the partial file into place once its size (and known checksum) match; ``digest`` is its SHA256."""
+    size = part.stat().st_size
+    if total is not None and size != total:
+        raise IncompleteDownloadError(f"{file_path.name}: received {size} of {total} bytes")
+    if sha256 is not None and digest != sha256.lower():
+        part.unlink()
+        raise ValueError(f"{file_path.name}: checksum mismatch (expected {sha256}, got {digest})")
+    os.replace(part, file_path)
+    return file_path
+
+
+def fetch(
+    url: str,
+    file_path: Path,
+    client: httpx.Client,
+    sha256: Optional[str] = None,
+    retries: int = MAX_RETRIES,
+    progress: Optional[Callable[[int], None]] = None,
+    on_start: Optional[Callable[[Optional[int], int], None]] = None,
+    validators: Optional[Dict[str, Dict[str, Any]]] = None
+) -> DownloadResult:
+    """
+    Downloads ``url`` to ``file_path`` through ``<file_path>.part``.
+
+    A partial file left by an earlier attempt (or an earlier run) is resumed with
+    an HTTP Range request when the server answers 206; otherwise the transfer
+    restarts from byte zero. ``file_path`` only appears, by atomic rename, once
+    the byte count matches the announced size and ``sha256`` (if given) matches.
+
+    Args:
+        progress: Called with the number of bytes of every chunk written.
+        on_start: Called with (total size or None, resume offset) per attempt.
+        validators: Per-URL validators of earlier downloads. The request is made
+            conditional on them and they are updated in place on success.
+
+    The SHA256 of the file is computed from the stream while it is written
+    (``DownloadResult.sha256``), so no second pass over the file is needed.
+    Errors are raised once the retries are exhausted; ``DownloadResult.not_modified``
+    is set when the server answered 304 Not Modified.
+    """
+    _discard_segmented(file_path)
+    part = part_path(file_path)
+    conditional = {} if part.exists() else _conditional_headers(validators, url, file_path)
+    result, started = DownloadResult(url, file_path), time.perf_counter()
+    digest = _StreamHash()
+    while True:
+        offset = part.stat().st_size if part.exists() else 0
+        try:
+            with client.stream("GET", url, headers=_request_headers(offset, conditional), follow_redirects=True) as response:
+                if response.status_code == 304:
+                    return _not_modified(result, validators, started)
+                offset = _start(response, part, offset)
+                if offset is None:
+                    digest.resume(part, part.stat().st_size)
+                else:
+                    digest.resume(part, offset)
+                    total = _total_size(response, offset)
+                    if on_start is not None:
+                        on_start(total, offset)
+                    with open(part, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_raw():
+                            f.write(chunk)
+                            digest.update(chunk)
+                            result.bytes += len(chunk)
+                            if progress is not None:
+                                progress(len(chunk))
+            result.sha256 = digest.hexdigest()
+            _finish(part, file_path, None if offset is None else total, sha256, result.sha256)
+            _remember(validators, url, response, file_path, result.sha256)
+            return result._stop(started)
+        except (httpx.TransportError, IncompleteDownloadError):
+            if result.retries >= retries:
+                raise
+            result.retries += 1
+            time.sleep(RETRY_BACKOFF * result.retries)
+
+
+def _not_modified(result: DownloadResult, validators: Optional[Dict[str, Dict[str, Any]]], started: float) -> DownloadResult:
+    """Result for a 304 answer: the kept file's digest is the one recorded with its validators."""
+    result.not_modified = True
+    result.sha256 = (validators or {}).get(result.url, {}).get("sha256")
+    return result._stop(started)
+
+
+def _probe(url: str, client: httpx.Client, conditional: Dict[str, str]) -> Optional[httpx.Response]:
+    """HEAD ``url`` (conditionally); None if the server does not answer HEAD."""
+    try:
+        response = client.head(url, headers={**HEADERS, **conditional}, follow_redirects=True)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    return response
+
+
+def _range_size(response: Optional[httpx.Response]) -> Optional[int]:
+    """Size of the file if the HEAD response announces a length and ``Accept-Ranges: bytes``."""
+    if response is None or response.headers.get("accept-ranges", "").lower() != "bytes":
+        return None
+    length = response.headers.get("content-length", "")
+    return int(length) if length.isdigit() else None
+
+
+def _load_ranges(path: Path, state: Dict) -> Set[int]:
+    """Starts of completed ranges, if ``path`` describes the same remote file split the same way."""
+    try:
+        saved = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return set()
+    if any(saved.get(key) != value for key, value in state.items()):
+        return set()
+    return set(saved.get("done", []))
+
+
+def _save_ranges(path: Path, state: Dict, done: Set[int]):
+    path.write_text(json.dumps({**state, "done": sorted(done)}))
+
+
+def fetch_segmented(
+    url: str,
+    file_path: Path,
+    client: httpx.Client,
+    segments: int,
+    segment_size: int,
+    sha256: Optional[str] = None,
+    retries: int = MAX_RETRIES,
+    progress: Optional[Callable[[int], None]] = None,
+    on_start: Optional[Callable[[Optional[int], int], None]] = None,
+    validators: Optional[Dict[str, Dict[str, Any]]] = None
+) -> DownloadResult:
+    """
+    Downloads ``url`` over up to ``segments`` pooled connections.
+
+    The file is split into ``segment_size`` byte ranges; each is fetched with its
+    own Range request and written at its offset into a preallocated ``.part``
+    file. Completed ranges are recorded in ``<file>.ranges.part``, so an
+    interrupted download only fetches what is missing; a ``.part`` left by a
+    single-stream download counts as the whole ranges it covers.
+
+    SHA256 cannot be combined from per-range digests, so the digest follows the
+    ranges in file order instead, reading each back (from the page cache) once
+    every range before it is complete; no worker waits for another's read-back.
+
+    Falls back to ``fetch`` when the server does not advertise
+    ``Accept-Ranges: bytes``, does not honour a range, or the file fits in one
+    segment. A conditional HEAD answered with 304 Not Modified keeps the
+    existing file (see ``fetch``).
+    """
+    part, ranges = part_path(file_path), ranges_path(file_path)
+    conditional = {} if part.exists() else _conditional_headers(validators, url, file_path)
+    result, started = DownloadResult(url, file_path), time.perf_counter()
+    head = _probe(url, client, conditional)
+    if head is not None and head.status_code == 304:
+        return _not_modified(result, validators, started)
+    size = _range_size(head)
+    if size is None or segments < 2 or size <= segment_size:
+        return fetch(url, file_path, client, sha256=sha256, retries=retries, progress=progress, on_start=on_start, validators=validators)
+
+    final_url = str(head.url)
+    validator = head.headers.get("etag") or head.headers.get("last-modified")
+    state = {"size": size, "validator": validator, "segment_size": segment_size}
+    done = _load_ranges(ranges, state) if part.exists() else set()
+    prefix = part.stat().st_size if part.exists() and not ranges.exists() else 0
+    if prefix <= size:
+        # A sequential download left a prefix behind: keep the whole ranges it already holds
+        done |= {start for start in range(0, size, segment_size) if min(start + segment_size, size) <= prefix}
+    # Record the layout before preallocating, so a full-size .part is never mistaken for a finished stream
+    if not done:
+        _save_ranges(ranges, state, done)
+        with open(part, "wb") as f:
+            f.truncate(size)
+    elif prefix:
+        _save_ranges(ranges, state, done)
+        with open(part, "r+b") as f:
+            f.truncate(size)
+    pending = [start for start in range(0, size, segment_size) if start not in done]
+    if on_start is not None:
+        on_start(size, sum(min(segment_size, size - start) for start in done))
+    lock, digest_lock = threading.Lock(), threading.Lock()
+    digest = _StreamHash()
+
+    def follow():
+        """
+        Extends the digest over the ranges completed contiguously from the start
+        of the file. The read-back runs outside ``lock``, in one thread at a time;
+        a thread that finds another one hashing leaves the catch-up to it.
+        """
+        while digest_lock.acquire(blocking=False):
+            try:
+                with lock:
+                    end = digest.size
+                    while end < size and end in done:
+                        end = min(end + segment_size, size)
+                if end == digest.size:
+                    return
+                digest.resume(part, end)
+            finally:
+                digest_lock.release()
+
+    def fetch_range(start: int):
+        end = min(start + segment_size, size) - 1
+        position, attempt = start, 0
+        with open(part, "r+b") as f:
+            while position <= end:
+                headers = {**HEADERS, "Range": f"bytes={position}-{end}"}
+                try:
+                    with client.stream("GET", final_url, headers=headers) as response:
+                        response.raise_for_status()
+                        if response.status_code != 206 or not response.headers.get("content-range", "").startswith(f"bytes {position}-"):
+                            raise RangeNotSupportedError(f"{url}: server ignored Range {headers['Range']}")
+                        f.seek(position)
+                        for chunk in response.iter_raw():
+                            chunk = chunk[:end + 1 - position]
+                            f.write(chunk)
+                            position += len(chunk)
+                            with lock:
+                                result.bytes += len(chunk)
+                            if progress is not None:
+                                progress(len(chunk))
+                    if position <= end:
+                        raise IncompleteDownloadError(f"{file_path.name}: range {start}-{end} cut short")
+                except (httpx.TransportError, IncompleteDownloadError):
+                    attempt += 1
+                    if attempt > retries:
+                        raise
+                    with lock:
+                        result.retries += 1
+                    time.sleep(RETRY_BACKOFF * attempt)
+        with lock:
+            done.add(start)
+            _save_ranges(ranges, state, done)
+        follow()
+
+    try:
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            futures = [executor.submit(fetch_range, start) for start in pending]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    except RangeNotSupportedError:
+        _discard_segmented(file_path)
+        return fetch(url, file_path, client, sha256=sha256, retries=retries, progress=progress, on_start=on_start, validators=validators)
+
+    ranges.unlink()
+    follow()
+    result.sha256 = digest.hexdigest()
+    _finish(part, file_path, size, sha256, result.sha256)
+    _remember(validators, url, head, file_path, result.sha256)
+    return result._stop(started)
+
+
+def _append(f: Any, digest: _StreamHash, block: bytes):
+    f.write(block)
+    digest.update(block)
+
+
+async def afetch(
+    url: str,
+    file_path: Path,
+    client: httpx.AsyncClient,
+    sha256: Optional[str] = None,
+    retries: int = MAX_RETRIES,
+    validators: Optional[Dict[str, Dict[str, Any]]] = None
+) -> DownloadResult:
+    """Async ``fetch`` over an ``httpx.AsyncClient``; same ``.part``, resume and validator semantics."""
+    import asyncio
+
+    _discard_segmented(file_path)
+    part = part_path(file_path)
+    conditional = {} if part.exists() else _conditional_headers(validators, url, file_path)
+    result, started = DownloadResult(url, file_path), time.perf_counter()
+    digest = _StreamHash()
+    while True:
+        offset = part.stat().st_size if part.exists() else 0
+        try:
+            async with client.stream("GET", url, headers=_request_headers(offset, conditional), follow_redirects=True) as response:
+                if response.status_code == 304:
+                    return _not_modified(result, validators, started)
+                offset = _start(response, part, offset)
+                if offset is None:
+                    await asyncio.to_thread(digest.resume, part, part.stat().st_size)
+                else:
+                    await asyncio.to_thread(digest.resume, part, offset)
+                    total = _total_size(response, offset)
+                    # File writes and hashing run in a worker thread, CHUNK_SIZE bytes at a time
+                    f = await asyncio.to_thread(open, part, "ab" if offset else "wb")
+                    try:
+                        buffer = bytearray()
+                        async for chunk in response.aiter_raw():
+                            buffer += chunk
+                            result.bytes += len(chunk)
+                            if len(buffer) >= CHUNK_SIZE:
+                                block, buffer = buffer, bytearray()
+                                await asyncio.to_thread(_append, f, digest, block)
+                        if buffer:
+                            await asyncio.to_thread(_append, f, digest, buffer)
+                    finally:
+                        await asyncio.to_thread(f.close)
+            result.sha256 = digest.hexdigest()
+            await asyncio.to_thread(_finish, part, file_path, None if offset is None else total, sha256, result.sha256)
+            _remember(validators, url, response, file_path, result.sha256)
+            return result._stop(started)
+        except (httpx.TransportError, IncompleteDownloadError):
+            if result.retries >= retries:
+                raise
+            result.retries += 1
+            await asyncio.sleep(RETRY_BACKOFF * result.retries)
@@ -1,45 +1,167 @@
-import httpx
+import asyncio
+import time
+from collections import Counter
+from importlib.util import find_spec
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Tuple, Optional
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+import httpx
 from tqdm import tqdm
+from retaildata.config import settings
+from retaildata.utils.download import DownloadResult, afetch
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (``pip install "retaildata[http2]"``)."""
+    return find_spec("h2") is not None
+
+
+class AdaptiveLimit:
+    """
+    Concurrency limit tuned by observed throughput.
+
+    After every window of ``limit`` finished transfers, the window's aggregate
+    bytes per second is compared with the best window so far: a gain of more
+    than 10% adds a slot (up to ``maximum``), a drop below 70% removes one.
+    A transfer that failed or needed retries halves the limit.
+    """
+
+    def __init__(self, initial: int, maximum: int, minimum: int = 1):
+        self.minimum, self.maximum = minimum, maximum
+        self.limit = max(minimum, min(initial, maximum))
+        self.peak = self.limit
+        self.active = 0
+        self._condition = asyncio.Condition()
+        self._best = 0.0
+        self._window_bytes, self._window_count = 0, 0
+        self._window_start = time.perf_counter()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self, result: DownloadResult):
+        async with self._condition:
+            self.active -= 1
+            if not result.ok or result.retries:
+                self.limit = max(self.minimum, self.limit // 2)
+            elif not result.not_modified:
+                self._observe(result.bytes)
+            self._condition.notify_all()
+
+    def _observe(self, nbytes: int):
+        self._window_bytes += nbytes
+        self._window_count += 1
+        if self._window_count < self.limit:
+            return
+        now = time.perf_counter()
+        rate = self._window_bytes / max(now - self._window_start, 1e-9)
+        if rate > self._best * 1.1:
+            self._best = rate
+            self.limit = min(self.maximum, self.limit + 1)
+            self.peak = max(self.peak, self.limit)
+        elif rate < self._best * 0.7:
+            self.limit = max(self.minimum, self.limit - 1)
+        self._window_bytes, self._window_count, self._window_start = 0, 0, now
+
 
 class ParallelDownloader:
     """
-    Utility for downloading multiple files in parallel.
+    Downloads many files concurrently on one asyncio event loop.
+
+    One ``httpx.AsyncClient`` reuses connections across files and speaks HTTP/2
+    when ``h2`` is installed, multiplexing transfers to a host over one
+    connection. At most ``per_host`` transfers run against the same host, and
+    the total adapts between 1 and ``max_workers`` to the observed throughput.
+    Every URL gets a ``DownloadResult``; transfer failures are reported there, not raised.
     """
-    
-    @staticmethod
-    def download_file(url: str, dest_dir: Path, client: httpx.Client) -> Tuple[str, bool]:
-        """Downloads a single file."""
-        filename = url.split("/")[-1]
-        file_path = dest_dir / filename
-        try:
-            with client.stream("GET", url, follow_redirects=True) as response:
-                response.raise_for_status()
-                with open(file_path, "wb") as f:
-                    for chunk in response.iter_bytes():
-                        f.write(chunk)
-            return filename, True
-        except Exception as e:
-            print(f"Error downloading {url}: {e}")
-            return filename, False
-
-    def download_many(self, urls: List[str], dest_dir: Path, max_workers: int = 4):
-        """Downloads multiple URLs in parallel."""
+
+    def download_many(
+        self,
+        urls: List[str],
+        dest_dir: Path,
+        max_workers: Optional[int] = None,
+        per_host: Optional[int] = None,
+        checksums: Optional[Dict[str, str]] = None,
+        validators: Optional[Dict[str, Dict[str, Any]]] = None,
+        progress: bool = True
+    ) -> List[DownloadResult]:
+        """Blocking ``adownload_many``."""
+        return run_coroutine(self.adownload_many(
+            urls, dest_dir, max_workers=max_workers, per_host=per_host,
+            checksums=checksums, validators=validators, progress=progress
+        ))
+
+    async def adownload_many(
+        self,
+        urls: List[str],
+        dest_dir: Path,
+        max_workers: Optional[int] = None,
+        per_host: Optional[int] = None,
+        checksums: Optional[Dict[str, str]] = None,
+        validators: Optional[Dict[str, Dict[str, Any]]] = None,
+        progress: bool = True
+    ) -> List[DownloadResult]:
+        """
+        Downloads ``urls`` into ``dest_dir``; results are in the order of ``urls``.
+
+        Args:
+            max_workers: Upper bound of concurrent transfers (default: settings.download_concurrency).
+            per_host: Concurrent transfers per host (default: settings.download_per_host).
+            checksums: Known SHA256 digests by file name, verified before a file is kept.
+            validators: Per-URL ETag/Last-Modified of earlier downloads, updated in place.
+            progress: Show a progress bar over files.
+
+        Raises ValueError before anything is fetched if two URLs end in the same
+        file name, since they would share one ``.part`` file and destination.
+        """
+        names = Counter(url.split("/")[-1] for url in urls)
+        duplicates = sorted(name for name, count in names.items() if count > 1)
+        if duplicates:
+            raise ValueError(f"URLs must have distinct file names; {duplicates} appear more than once")
         dest_dir.mkdir(parents=True, exist_ok=True)
-        
-        results = []
-        with httpx.Client(timeout=60.0) as client:
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(self.download_file, url, dest_dir, client): url for url in urls}
-                
-                with tqdm(total=len(urls), desc="Downloading files", unit="file") as progress:
-                    for future in as_completed(futures):
-                        filename, success = future.result()
-                        results.append((filename, success))
-                        progress.update(1)
-        
-        return results
+        checksums = checksums or {}
+        max_workers = max_workers or settings.download_concurrency
+        per_host = per_host or settings.download_per_host
+        limit = AdaptiveLimit(initial=min(4, max_workers), maximum=max_workers)
+        hosts: Dict[str, asyncio.Semaphore] = {}
+
+        async def download(client: httpx.AsyncClient, url: str, bar: tqdm) -> DownloadResult:
+            filename = url.split("/")[-1]
+            result = DownloadResult(url, dest_dir / filename)
+            async with hosts.setdefault(urlsplit(url).netloc, asyncio.Semaphore(per_host)):
+                await limit.acquire()
+                started = time.perf_counter()
+                try:
+                    result = await afetch(url, result.path, client, sha256=checksums.get(filename), validators=validators)
+                except Exception as e:
+                    result.error = str(e) or type(e).__name__
+                    result.seconds = time.perf_counter() - started
+                finally:
+                    await limit.release(result)
+            bar.update(1)
+            return result
+
+        client = httpx.AsyncClient(
+            timeout=60.0,
+            http2=http2_available(),
+            limits=httpx.Limits(max_connections=max_workers, max_keepalive_connections=max_workers),
+        )
+        with tqdm(total=len(urls), desc="Downloading files", unit="file", disable=not progress) as bar:
+            async with client:
+                return list(await asyncio.gather(*(download(client, url, bar) for url in urls)))
+
 
 parallel_downloader = ParallelDownloader()
+
+
+def run_coroutine(coro: Any) -> Any:
+    """``asyncio.run`` that also works when called from a running loop (e.g. Jupyter)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
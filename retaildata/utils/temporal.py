@@ -0,0 +1,207 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import polars as pl
+
+
+def parse_dates(lf: pl.LazyFrame, date_col: str) -> pl.LazyFrame:
+    """Parses ``date_col`` to Datetime when it is stored as strings; Date/Datetime columns pass through."""
+    dtype = lf.collect_schema()[date_col]
+    if dtype == pl.String:
+        return lf.with_columns(pl.col(date_col).str.to_datetime())
+    return lf
+
+
+def cutoff_values(cutoffs: Sequence[Any], dtype: Any) -> pl.Series:
+    """Parses cutoff dates (strings, dates or datetimes) into a Series comparable with a ``dtype`` column."""
+    values = pl.Series("cutoff", list(cutoffs))
+    if values.dtype == pl.String:
+        values = values.str.to_datetime()
+    if values.dtype == pl.Date:
+        values = values.cast(pl.Datetime("us"))
+    if isinstance(dtype, pl.Datetime):
+        if dtype.time_zone is not None and values.dtype.time_zone is None:
+            values = values.dt.replace_time_zone(dtype.time_zone)
+        values = values.cast(dtype)
+    return values
+
+
+def sorted_dates(df: pl.DataFrame, date_col: str) -> pl.Series:
+    """The (sorted) date column of ``df`` as Datetime, so cutoffs can be located by binary search."""
+    dates = df.get_column(date_col)
+    return dates.cast(pl.Datetime("us")) if dates.dtype == pl.Date else dates
+
+
+def split_sorted(df: pl.DataFrame, date_col: str, cutoffs: Sequence[Any]) -> List[Dict[str, pl.DataFrame]]:
+    """
+    Splits a frame sorted by ``date_col`` (nulls last) at every cutoff.
+
+    Each cutoff is located by binary search and both sides are zero-copy
+    slices, so many cutoffs cost no more than one.
+    """
+    dates = sorted_dates(df, date_col)
+    valid = len(dates) - dates.null_count()
+    positions = dates.head(valid).search_sorted(cutoff_values(cutoffs, dates.dtype), side="left")
+    return [{"train": df.slice(0, pos), "test": df.slice(pos, valid - pos)} for pos in positions.to_list()]
+
+
+@dataclass
+class Fold:
+    """
+    One rolling-origin backtest fold; iterating it yields ``(train, test)``.
+
+    Rows refer to the frame sorted by date (by series, then date, for panels):
+    ``range`` objects on a single time axis, Series of row indices for panels.
+    Eager folds keep only these rows and materialize ``train``/``test`` on access.
+    """
+    index: int
+    origin: Any = None  # first test date (single time axis only)
+    train_rows: Any = None
+    test_rows: Any = None
+    _frame: Any = field(default=None, repr=False)
+    _train: Any = field(default=None, repr=False)
+    _test: Any = field(default=None, repr=False)
+
+    @property
+    def train(self) -> Any:
+        return self._train if self._train is not None else _take(self._frame, self.train_rows)
+
+    @property
+    def test(self) -> Any:
+        return self._test if self._test is not None else _take(self._frame, self.test_rows)
+
+    def __iter__(self) -> Iterator[Any]:
+        yield self.train
+        yield self.test
+
+
+def _take(frame: pl.DataFrame, rows: Any) -> pl.DataFrame:
+    if isinstance(rows, range):
+        return frame.slice(rows.start, len(rows))
+    return frame[rows]
+
+
+def _fold_bounds(n: Any, horizon: int, n_folds: int, step: int, gap: int, train_size: Optional[int]) -> List[Tuple[Any, Any, Any, Any]]:
+    """
+    Period bounds ``(train_start, train_end, test_start, test_end)`` of every fold,
+    oldest first, for a series of ``n`` periods (an int, or an expression per series).
+    The last fold's test window ends with the last period.
+    """
+    bounds = []
+    for k in range(n_folds):
+        test_end = n - (n_folds - 1 - k) * step
+        test_start = test_end - horizon
+        train_end = test_start - gap
+        train_start = train_end - train_size if train_size is not None else 0
+        bounds.append((train_start, train_end, test_start, test_end))
+    return bounds
+
+
+def backtest_folds(
+    frame: Union[pl.DataFrame, pl.LazyFrame],
+    date_col: str,
+    horizon: int,
+    n_folds: int,
+    step: Optional[int] = None,
+    gap: int = 0,
+    window: str = "expanding",
+    train_size: Optional[int] = None,
+    series_col: Optional[Union[str, List[str]]] = None
+) -> List[Fold]:
+    """
+    Rolling-origin backtest folds over distinct time points of ``date_col``.
+
+    Args:
+        frame: The table; a DataFrame gives sliced folds, a LazyFrame filtered LazyFrames.
+        date_col: Date column (Date/Datetime, or strings parsed once).
+        horizon: Periods in each test window.
+        n_folds: Number of folds; the last test window ends with the last period.
+        step: Periods between consecutive origins (defaults to ``horizon``).
+        gap: Periods skipped between the end of train and the start of test.
+        window: 'expanding' (train starts at the first period) or 'sliding'.
+        train_size: Periods in each training window for ``window='sliding'``.
+        series_col: Series id column(s) of a panel; periods are then counted per
+            series, so every series is backtested on its own last periods.
+
+    The frame is sorted once. On a single time axis every fold is a pair of
+    zero-copy row-range slices of the sorted frame.
+    """
+    if window not in ("expanding", "sliding"):
+        raise ValueError(f"window must be 'expanding' or 'sliding', got '{window}'")
+    if window == "sliding" and not train_size:
+        raise ValueError("window='sliding' requires train_size")
+    step = step or horizon
+    train_size = train_size if window == "sliding" else None
+    series = [series_col] if isinstance(series_col, str) else list(series_col or [])
+    lazy = isinstance(frame, pl.LazyFrame)
+    lf = parse_dates(frame.lazy(), date_col)
+
+    if series:
+        return _panel_folds(lf, date_col, series, lazy, horizon, n_folds, step, gap, train_size)
+
+    # One scan of the date column: distinct dates and the row offset where each starts once sorted
+    runs = lf.group_by(date_col).len().drop_nulls(date_col).sort(date_col).collect()
+    dates = runs.get_column(date_col)
+    offsets = [0] + runs.get_column("len").cum_sum().to_list()
+    bounds = _fold_bounds(len(dates), horizon, n_folds, step, gap, train_size)
+    if bounds[0][1] <= max(bounds[0][0], 0):
+        raise ValueError(f"Not enough history for {n_folds} folds: {len(dates)} periods in '{date_col}'")
+
+    sorted_df = None if lazy else lf.drop_nulls(date_col).sort(date_col, maintain_order=True).collect()
+    folds = []
+    for k, (train_start, train_end, test_start, test_end) in enumerate(bounds):
+        train_start = max(train_start, 0)
+        fold = Fold(
+            index=k,
+            origin=dates[test_start],
+            train_rows=range(offsets[train_start], offsets[train_end]),
+            test_rows=range(offsets[test_start], offsets[test_end]),
+            _frame=sorted_df,
+        )
+        if lazy:
+            col = pl.col(date_col)
+            fold._train = lf.filter((col >= dates[train_start]) & (col < dates[train_end]))
+            fold._test = lf.filter((col >= dates[test_start]) & (col <= dates[test_end - 1]))
+        folds.append(fold)
+    return folds
+
+
+def _panel_folds(
+    lf: pl.LazyFrame,
+    date_col: str,
+    series: List[str],
+    lazy: bool,
+    horizon: int,
+    n_folds: int,
+    step: int,
+    gap: int,
+    train_size: Optional[int]
+) -> List[Fold]:
+    """Per-series folds: the period index and length are computed within every series."""
+    period = (pl.col(date_col).rank("dense") - 1).over(series)
+    n = pl.col(date_col).n_unique().over(series)
+    bounds = _fold_bounds(n, horizon, n_folds, step, gap, train_size)
+
+    def window(start, end):
+        return (period >= start) & (period < end)
+
+    if lazy:
+        lf = lf.drop_nulls(date_col)
+        return [
+            Fold(index=k, _train=lf.filter(window(a, b)), _test=lf.filter(window(c, d)))
+            for k, (a, b, c, d) in enumerate(bounds)
+        ]
+
+    sorted_df = lf.drop_nulls(date_col).sort(series + [date_col], maintain_order=True).collect()
+    masks = sorted_df.select(
+        [window(a, b).alias(f"train_{k}") for k, (a, b, _, _) in enumerate(bounds)]
+        + [window(c, d).alias(f"test_{k}") for k, (_, _, c, d) in enumerate(bounds)]
+    )
+    return [
+        Fold(
+            index=k,
+            train_rows=masks.get_column(f"train_{k}").arg_true(),
+            test_rows=masks.get_column(f"test_{k}").arg_true(),
+            _frame=sorted_df,
+        )
+        for k in range(n_folds)
+    ]
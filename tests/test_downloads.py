@@ -0,0 +1,432 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+import polars as pl
+import pytest
+from retaildata.datasets.registry import Dataset, Registry
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class RangeHandler(QuietHandler):
+    """
+    Serves files with ``Range: bytes=a-b`` support (unless ``server.state.accept_ranges``
+    is off). ``server.state.drops`` makes that many responses close the connection
+    after ``drop_after`` body bytes.
+    """
+
+    def _not_modified(self, path: Path) -> bool:
+        """Sends validators (or a 304 if the client already has them) and records the request."""
+        stat = path.stat()
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.state.requests.append((self.command, 304))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return True
+        self.server.state.requests.append((self.command, 200))
+        self._validators = {"ETag": etag, "Last-Modified": self.date_time_string(stat.st_mtime)}
+        return False
+
+    def end_headers(self):
+        for name, value in getattr(self, "_validators", {}).items():
+            self.send_header(name, value)
+        super().end_headers()
+
+    def do_HEAD(self):
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            return self.send_error(404)
+        if self._not_modified(path):
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(path.stat().st_size))
+        if self.server.state.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        state = self.server.state
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            return self.send_error(404)
+        if self._not_modified(path):
+            return
+        data = path.read_bytes()
+        requested = self.headers.get("Range") if state.accept_ranges else None
+        state.ranges.append(requested)
+        start, end = 0, len(data) - 1
+        if requested:
+            first, _, last = requested.split("=", 1)[1].partition("-")
+            start, end = int(first), min(int(last), end) if last else end
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        body = data[start:end + 1]
+        self.send_response(206 if requested else 200)
+        if requested:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.send_header("Content-Length", str(len(body)))
+        if state.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        with state.lock:
+            drop = state.drops > 0
+            state.drops -= drop
+        if drop:
+            self.wfile.write(body[:state.drop_after])
+            self.close_connection = True
+            return
+        with state.lock:
+            state.active += 1
+            state.peak = max(state.peak, state.active)
+        time.sleep(state.delay)
+        self.wfile.write(body)
+        with state.lock:
+            state.active -= 1
+
+
+@pytest.fixture
+def http_server(tmp_path):
+    """Serves ``tmp_path / "www"`` on localhost; yields its root, base URL and handler state."""
+    root = tmp_path / "www"
+    root.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeHandler, directory=str(root)))
+    server.state = SimpleNamespace(
+        requests=[], ranges=[], drops=0, drop_after=0, accept_ranges=True, active=0, peak=0, delay=0, lock=threading.Lock()
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield SimpleNamespace(root=root, url=f"http://127.0.0.1:{server.server_address[1]}", state=server.state)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def register(monkeypatch):
+    def _register(**fields):
+        dataset = Dataset(topic_tags=["test"], **fields)
+        monkeypatch.setitem(Registry._datasets, dataset.id, dataset)
+        return dataset
+    return _register
+
+
+def test_async_get_overlaps_http_and_blocking_providers(tmp_path, http_server, register, monkeypatch):
+    from retaildata.api import api
+    from retaildata.providers.kaggle import KaggleProvider
+
+    root, base_url = http_server.root, http_server.url
+    pl.DataFrame({"a": [1, 2, 3]}).write_csv(root / "one.csv")
+    pl.DataFrame({"b": [4, 5]}).write_csv(root / "two.csv")
+    register(id="async_single", provider="http", url=f"{base_url}/one.csv")
+    register(id="async_multi", provider="http", urls=[f"{base_url}/one.csv", f"{base_url}/two.csv"])
+    register(id="async_kaggle", provider="kaggle", kaggle_id="x/y")
+
+    threads = []
+
+    def fake_kaggle(self, dataset, destination, meta_dir, **kwargs):
+        threads.append(threading.current_thread())
+        destination.mkdir(parents=True, exist_ok=True)
+        pl.DataFrame({"c": [1]}).write_csv(destination / "k.csv")
+
+    monkeypatch.setattr(KaggleProvider, "download", fake_kaggle)
+
+    async def main():
+        return await asyncio.gather(
+            api.aget("async_single", data_dir=tmp_path, prepare=True),
+            api.aget("async_multi", data_dir=tmp_path),
+            api.aget("async_kaggle", data_dir=tmp_path, prepare=True, split_fraction=0.5),
+        )
+
+    single, multi, kaggle = asyncio.run(main())
+    assert single["one"]["a"].to_list() == [1, 2, 3]
+    assert multi is None
+    assert sorted(p.name for p in (tmp_path / "raw" / "async_multi").iterdir()) == ["one.csv", "two.csv"]
+    assert (tmp_path / "meta" / "async_multi" / "checksums.json").exists()
+    assert sorted(kaggle) == ["k_test", "k_train"]
+    # The blocking SDK ran off the event loop thread
+    assert threads and threads[0] is not threading.main_thread()
+
+    loaded = asyncio.run(api.aload("async_single", data_dir=tmp_path, columns=["a"]))
+    assert loaded["one"].columns == ["a"]
+
+
+def test_get_many_limits_providers_and_reports_failures(tmp_path, http_server, register, monkeypatch):
+    from typer.testing import CliRunner
+    from retaildata.api import get_many
+    from retaildata.cli import app
+    from retaildata.providers.kaggle import KaggleProvider
+
+    root, base_url = http_server.root, http_server.url
+    pl.DataFrame({"a": [1, 2, 3, 4]}).write_csv(root / "one.csv")
+    register(id="many_http", provider="http", url=f"{base_url}/one.csv")
+    register(id="many_missing", provider="http", url=f"{base_url}/missing.csv")
+    for i in range(3):
+        register(id=f"many_kaggle_{i}", provider="kaggle", kaggle_id="x/y")
+
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_kaggle(self, dataset, destination, meta_dir, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        destination.mkdir(parents=True, exist_ok=True)
+        pl.DataFrame({"c": [1, 2]}).write_csv(destination / "k.csv")
+        if dataset.id == "many_kaggle_0":
+            (destination / "broken.xlsx").write_bytes(b"not a workbook")
+        with lock:
+            running[0] -= 1
+
+    monkeypatch.setattr(KaggleProvider, "download", fake_kaggle)
+
+    ids = ["many_http", "many_missing", "unknown_dataset"] + [f"many_kaggle_{i}" for i in range(3)]
+    results = get_many(ids, data_dir=tmp_path, prepare=True, jobs=8, provider_limits={"kaggle": 1}, split_fraction=0.5)
+
+    assert list(results) == ids
+    assert results["many_http"].ok and results["many_http"].prepared
+    assert "404" in results["many_missing"].error
+    assert "not found" in results["unknown_dataset"].error
+    # One file failing to prepare fails the dataset, even though k.csv was prepared
+    partial = results["many_kaggle_0"]
+    assert not partial.ok and partial.prepared is False and partial.error is None
+    assert list(partial.prepare_errors) == ["broken.xlsx"]
+    assert all(results[f"many_kaggle_{i}"].ok for i in (1, 2))
+    assert peak[0] == 1
+    assert (tmp_path / "prepared" / "many_kaggle_2" / "k_train.parquet").exists()
+
+    out = CliRunner().invoke(app, ["get", "many_http", "many_missing", "--output", str(tmp_path), "--jobs", "2"])
+    assert out.exit_code == 1
+    assert "many_http" in out.output and "Failed" in out.output
+
+
+def test_dropped_download_resumes_from_partial_file(tmp_path, http_server, register, monkeypatch):
+    from retaildata.api import api
+    from retaildata.utils import download
+
+    monkeypatch.setattr(download, "RETRY_BACKOFF", 0)
+    payload = bytes(range(256)) * 40
+    (http_server.root / "big.bin").write_bytes(payload)
+    register(id="resume_single", provider="http", url=f"{http_server.url}/big.bin")
+    http_server.state.drops, http_server.state.drop_after = 1, 1000
+
+    api.download("resume_single", data_dir=tmp_path)
+
+    raw = tmp_path / "raw" / "resume_single"
+    assert (raw / "big.bin").read_bytes() == payload
+    assert http_server.state.ranges == [None, "bytes=1000-"]
+    assert not (raw / "big.bin.part").exists()
+    checksums = json.loads((tmp_path / "meta" / "resume_single" / "checksums.json").read_text())
+    assert checksums == {"big.bin": hashlib.sha256(payload).hexdigest()}
+
+
+def test_parallel_downloader_resumes_and_verifies_checksums(tmp_path, http_server):
+    from retaildata.utils.parallel import parallel_downloader
+
+    payload = b"retaildata" * 500
+    (http_server.root / "a.bin").write_bytes(payload)
+    (http_server.root / "b.bin").write_bytes(payload)
+    dest = tmp_path / "out"
+    dest.mkdir()
+    # A partial file left by an interrupted run is continued, not restarted
+    (dest / "a.bin.part").write_bytes(payload[:700])
+
+    checksums = {"a.bin": hashlib.sha256(payload).hexdigest(), "b.bin": "0" * 64}
+    urls = [f"{http_server.url}/a.bin", f"{http_server.url}/b.bin"]
+    a, b = parallel_downloader.download_many(urls, dest, checksums=checksums)
+
+    assert a.ok and a.bytes == len(payload) - 700
+    assert not b.ok and "checksum mismatch" in b.error
+    assert "bytes=700-" in http_server.state.ranges
+    assert (dest / "a.bin").read_bytes() == payload
+    # A file that fails verification never appears under its final name
+    assert sorted(p.name for p in dest.iterdir()) == ["a.bin"]
+
+
+@pytest.mark.parametrize("accept_ranges", [True, False])
+def test_segmented_download_reassembles_ranges(tmp_path, http_server, register, monkeypatch, accept_ranges):
+    from retaildata.api import api
+    from retaildata.utils import download
+
+    monkeypatch.setattr(download, "RETRY_BACKOFF", 0)
+    payload = bytes(range(256)) * 100
+    (http_server.root / "large.bin").write_bytes(payload)
+    register(id="segmented", provider="http", url=f"{http_server.url}/large.bin")
+    http_server.state.accept_ranges = accept_ranges
+    # One segment's connection drops midway and is resumed within its range
+    http_server.state.drops, http_server.state.drop_after = 1, 100
+
+    api.download("segmented", data_dir=tmp_path, segments=4, segment_size=4096)
+
+    raw = tmp_path / "raw" / "segmented"
+    assert (raw / "large.bin").read_bytes() == payload
+    assert sorted(p.name for p in raw.iterdir()) == ["large.bin"]
+    requested = [r for r in http_server.state.ranges if r]
+    if accept_ranges:
+        # 7 ranges of 4 KiB cover the 25600 bytes, plus one request resuming the dropped range
+        assert len(requested) == 8
+        assert {f"bytes={start}-{min(start + 4096, len(payload)) - 1}" for start in range(0, len(payload), 4096)} <= set(requested)
+    else:
+        # No Accept-Ranges: one plain stream, restarted from zero after the drop
+        assert requested == [] and len(http_server.state.ranges) == 2
+
+
+def test_segmented_download_reuses_single_stream_part(tmp_path, http_server, register):
+    from retaildata.api import api
+
+    payload = bytes(range(256)) * 100
+    (http_server.root / "large.bin").write_bytes(payload)
+    register(id="segmented_resume", provider="http", url=f"{http_server.url}/large.bin")
+    raw = tmp_path / "raw" / "segmented_resume"
+    raw.mkdir(parents=True)
+    (raw / "large.bin.part").write_bytes(payload[:10000])
+
+    api.download("segmented_resume", data_dir=tmp_path, segments=4, segment_size=4096)
+
+    assert (raw / "large.bin").read_bytes() == payload
+    # The ranges starting at 0 and 4096 were already on disk
+    starts = sorted(int(r.split("=")[1].split("-")[0]) for r in http_server.state.ranges if r)
+    assert starts == [8192, 12288, 16384, 20480, 24576]
+
+
+def test_async_get_passes_segments_through(tmp_path, http_server, register):
+    from retaildata.api import api
+
+    payload = bytes(range(256)) * 100
+    (http_server.root / "large.bin").write_bytes(payload)
+    register(id="segmented_async", provider="http", url=f"{http_server.url}/large.bin")
+
+    asyncio.run(api.aget("segmented_async", data_dir=tmp_path, segments=4, segment_size=4096))
+
+    assert (tmp_path / "raw" / "segmented_async" / "large.bin").read_bytes() == payload
+    assert len([r for r in http_server.state.ranges if r]) == 7
+
+
+def test_unchanged_files_are_not_downloaded_again(tmp_path, http_server, register):
+    import os
+    from retaildata.api import api
+
+    for name in ("single.csv", "a.csv", "b.csv"):
+        pl.DataFrame({"x": list(range(50))}).write_csv(http_server.root / name)
+    register(id="cond_single", provider="http", url=f"{http_server.url}/single.csv")
+    register(id="cond_multi", provider="http", urls=[f"{http_server.url}/a.csv", f"{http_server.url}/b.csv"])
+    requests = http_server.state.requests
+
+    for dataset_id in ("cond_single", "cond_multi"):
+        api.download(dataset_id, data_dir=tmp_path)
+    validators = json.loads((tmp_path / "meta" / "cond_multi" / "validators.json").read_text())
+    assert set(validators) == {f"{http_server.url}/a.csv", f"{http_server.url}/b.csv"}
+    assert all(v["etag"] and v["content_length"] == (http_server.root / "a.csv").stat().st_size for v in validators.values())
+
+    requests.clear()
+    for dataset_id in ("cond_single", "cond_multi"):
+        api.download(dataset_id, data_dir=tmp_path)
+    # The single file is checked with one conditional HEAD, each multi file with a conditional GET
+    assert sorted(requests) == [("GET", 304), ("GET", 304), ("HEAD", 304)]
+
+    requests.clear()
+    pl.DataFrame({"x": list(range(60))}).write_csv(http_server.root / "b.csv")
+    os.utime(http_server.root / "b.csv", ns=(0, 10**18))
+    api.download("cond_multi", data_dir=tmp_path)
+    assert sorted(requests) == [("GET", 200), ("GET", 304)]
+    assert (tmp_path / "raw" / "cond_multi" / "b.csv").read_bytes() == (http_server.root / "b.csv").read_bytes()
+
+    # A missing local file, or cache=False, always downloads again
+    requests.clear()
+    (tmp_path / "raw" / "cond_multi" / "a.csv").unlink()
+    api.download("cond_multi", data_dir=tmp_path, cache=False)
+    assert sorted(requests) == [("GET", 200), ("GET", 200)]
+
+
+def test_async_downloader_limits_hosts_and_reports_each_file(tmp_path, http_server, monkeypatch):
+    from retaildata.utils import download
+    from retaildata.utils.parallel import AdaptiveLimit, ParallelDownloader
+
+    monkeypatch.setattr(download, "RETRY_BACKOFF", 0)
+    for i in range(150):
+        (http_server.root / f"day_{i:03d}.csv").write_text(f"day,sales\n{i},{i * 10}\n")
+    urls = [f"{http_server.url}/day_{i:03d}.csv" for i in range(150)] + [f"{http_server.url}/missing.csv"]
+    http_server.state.delay = 0.005
+    http_server.state.drops, http_server.state.drop_after = 1, 3
+
+    threads_before = threading.active_count()
+    results = ParallelDownloader().download_many(urls, tmp_path / "out", max_workers=8, per_host=3, progress=False)
+
+    assert [r.url for r in results] == urls
+    assert all(r.ok and r.bytes > 0 and r.seconds > 0 for r in results[:-1])
+    assert sum(r.retries for r in results) == 1
+    assert "404" in results[-1].error and not results[-1].path.exists()
+    assert (tmp_path / "out" / "day_149.csv").read_text() == "day,sales\n149,1490\n"
+    assert 1 < http_server.state.peak <= 3
+    # One event loop, not a thread per file
+    assert threading.active_count() - threads_before <= 2
+
+    # Two URLs ending in the same name would share one .part file
+    with pytest.raises(ValueError, match="day_000.csv"):
+        ParallelDownloader().download_many(urls[:1] + [f"{http_server.url}/other/day_000.csv"], tmp_path / "dup", progress=False)
+
+    async def adapt():
+        limit = AdaptiveLimit(initial=2, maximum=4)
+        ok = download.DownloadResult("u", tmp_path, bytes=10**6)
+        for _ in range(2):
+            await limit.acquire()
+        await limit.release(ok)
+        await limit.release(ok)
+        grown = limit.limit
+        await limit.acquire()
+        await limit.release(download.DownloadResult("u", tmp_path, error="boom"))
+        return grown, limit.limit
+
+    assert asyncio.run(adapt()) == (3, 1)
+
+
+def test_checksums_come_from_the_download_stream(tmp_path, http_server, register, monkeypatch):
+    from retaildata.api import api
+    from retaildata.postprocess.metadata import MetadataManager
+    from retaildata.utils import download
+
+    monkeypatch.setattr(download, "RETRY_BACKOFF", 0)
+    payload = bytes(range(256)) * 64
+    (http_server.root / "big.bin").write_bytes(payload)
+    (http_server.root / "a.csv").write_text("a\n1\n")
+    register(id="hash_single", provider="http", url=f"{http_server.url}/big.bin")
+    register(id="hash_multi", provider="http", urls=[f"{http_server.url}/a.csv", f"{http_server.url}/big.bin"])
+
+    hashed = []
+    calculate = MetadataManager.calculate_checksum
+    monkeypatch.setattr(MetadataManager, "calculate_checksum", staticmethod(lambda path: hashed.append(path.name) or calculate(path)))
+
+    def checksums(dataset_id):
+        return json.loads((tmp_path / "meta" / dataset_id / "checksums.json").read_text())
+
+    expected = hashlib.sha256(payload).hexdigest()
+    # Segmented, with one range resumed after a dropped connection
+    http_server.state.drops, http_server.state.drop_after = 1, 100
+    api.download("hash_single", data_dir=tmp_path, segments=3, segment_size=4096)
+    assert checksums("hash_single") == {"big.bin": expected}
+
+    # Multi-file, then a file the library did not write (e.g. extracted from an archive)
+    api.download("hash_multi", data_dir=tmp_path)
+    (tmp_path / "raw" / "hash_multi" / "extracted.txt").write_text("x")
+    # Unchanged files (304) reuse the digest recorded with their validators
+    api.download("hash_multi", data_dir=tmp_path)
+    assert checksums("hash_multi") == {
+        "a.csv": hashlib.sha256(b"a\n1\n").hexdigest(),
+        "big.bin": expected,
+        "extracted.txt": hashlib.sha256(b"x").hexdigest(),
+    }
+    assert hashed == ["extracted.txt"]
@@ -0,0 +1,587 @@
+import polars as pl
+import pytest
+from retaildata.processing.manager import ProcessingManager
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    raw_dir = tmp_path / "raw" / "bank_marketing_uci"
+    raw_dir.mkdir(parents=True)
+    pl.DataFrame({
+        "age": list(range(1000)),
+        "job": ["admin", "technician"] * 500,
+        "balance": [float(i) for i in range(1000)],
+    }).write_csv(raw_dir / "data.csv")
+    return tmp_path
+
+
+def test_streaming_prepare_matches_eager(raw_csv):
+    manager = ProcessingManager()
+    assert manager.process_dataset("bank_marketing_uci", data_dir=raw_csv, streaming=True)
+
+    df = pl.read_parquet(raw_csv / "prepared" / "bank_marketing_uci" / "data.parquet")
+    assert df.shape == (1000, 3)
+    # expected_schema overrides still apply to the lazy scan
+    assert df.schema["age"] == pl.Int64
+
+
+def test_streaming_prepare_sample_and_split(raw_csv):
+    manager = ProcessingManager()
+    manager.process_dataset(
+        "bank_marketing_uci", data_dir=raw_csv, streaming=True,
+        sample_fraction=0.5, split_fraction=0.8
+    )
+
+    prepared = raw_csv / "prepared" / "bank_marketing_uci"
+    train = pl.read_parquet(prepared / "data_train.parquet")
+    test = pl.read_parquet(prepared / "data_test.parquet")
+    assert 350 < len(train) + len(test) < 650
+    assert len(train) > len(test)
+    assert train.join(test, on="age").is_empty()
+
+
+def test_parallel_prepare_reports_per_file(raw_csv):
+    raw_dir = raw_csv / "raw" / "bank_marketing_uci"
+    pl.DataFrame({"age": [1, 2, 3]}).write_csv(raw_dir / "second.csv")
+    (raw_dir / "broken.xlsx").write_bytes(b"not a workbook")
+
+    results = ProcessingManager().prepare("bank_marketing_uci", data_dir=raw_csv, workers=2)
+
+    by_name = {r.name: r for r in results}
+    assert by_name["data.csv"].outputs == ["data.parquet"]
+    assert by_name["second.csv"].ok
+    assert not by_name["broken.xlsx"].ok
+    assert (raw_csv / "prepared" / "bank_marketing_uci" / "second.parquet").exists()
+
+
+def test_parallel_prepare_applies_runtime_registered_schema(tmp_path, monkeypatch):
+    from retaildata.datasets.registry import Dataset, Registry
+
+    dataset = Dataset(id="runtime_ds", topic_tags=["test"], provider="http", expected_schema={"code": "String"})
+    monkeypatch.setitem(Registry._datasets, dataset.id, dataset)
+    raw_dir = tmp_path / "raw" / "runtime_ds"
+    raw_dir.mkdir(parents=True)
+    for name in ("a.csv", "b.csv"):
+        pl.DataFrame({"code": [1, 2, 3]}).write_csv(raw_dir / name)
+
+    results = ProcessingManager().prepare("runtime_ds", data_dir=tmp_path, workers=2)
+
+    assert all(r.ok for r in results)
+    # The spawned workers never see the runtime registration; the override travels on the task
+    assert pl.read_parquet(tmp_path / "prepared" / "runtime_ds" / "a.parquet").schema["code"] == pl.String
+
+
+def test_incremental_prepare_skips_unchanged_files(raw_csv, monkeypatch):
+    manager = ProcessingManager()
+    first = manager.prepare("bank_marketing_uci", data_dir=raw_csv)
+    assert [r.skipped for r in first] == [False]
+
+    second = manager.prepare("bank_marketing_uci", data_dir=raw_csv)
+    assert [r.skipped for r in second] == [True]
+
+    # Changing the options re-prepares and removes outputs the new run no longer writes
+    from retaildata.processing import PrepareOptions
+    third = manager.prepare("bank_marketing_uci", data_dir=raw_csv, options=PrepareOptions(split_fraction=0.8))
+    assert [r.skipped for r in third] == [False]
+    prepared = raw_csv / "prepared" / "bank_marketing_uci"
+    assert sorted(p.name for p in prepared.iterdir()) == ["data_test.parquet", "data_train.parquet"]
+
+    # Changing the raw file (checksum) re-prepares as well
+    pl.DataFrame({"age": [1]}).write_csv(raw_csv / "raw" / "bank_marketing_uci" / "data.csv")
+    fourth = manager.prepare("bank_marketing_uci", data_dir=raw_csv, options=PrepareOptions(split_fraction=0.8))
+    assert [r.skipped for r in fourth] == [False]
+
+    # Seeded splits hash with Expr.hash, so a Polars upgrade re-prepares too
+    monkeypatch.setattr(pl, "__version__", "0.0.0")
+    fifth = manager.prepare("bank_marketing_uci", data_dir=raw_csv, options=PrepareOptions(split_fraction=0.8))
+    assert [r.skipped for r in fifth] == [False]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_partitioned_prepare_is_loaded_transparently(tmp_path, streaming):
+    from retaildata.api import api
+
+    raw_dir = tmp_path / "raw" / "store_sales"
+    raw_dir.mkdir(parents=True)
+    pl.DataFrame({
+        "date": ["2016-01-01", "2016-02-01", "2017-01-01", "2017-01-02"],
+        "store_nbr": [1, 2, 1, 2],
+        "sales": [1.0, 2.0, 3.0, 4.0],
+    }).write_csv(raw_dir / "train.csv")
+
+    ProcessingManager().process_dataset(
+        "store_sales", data_dir=tmp_path, streaming=streaming,
+        partition_by=["store_nbr"], partition_date_col="date", row_group_size=1
+    )
+
+    table_dir = tmp_path / "prepared" / "store_sales" / "train"
+    assert (table_dir / "date_year=2017" / "date_month=1" / "store_nbr=2").is_dir()
+
+    lf = api.load("store_sales", data_dir=tmp_path, lazy=True)["train"]
+    df = lf.filter((pl.col("date_year") == 2017) & (pl.col("store_nbr") == 2)).collect()
+    assert df["sales"].to_list() == [4.0]
+    assert len(api.load("store_sales", data_dir=tmp_path)["train"]) == 4
+
+
+def test_partitioned_lazy_frames_are_sorted(tmp_path):
+    from retaildata.processing.partition import write_partitioned
+
+    lf = pl.LazyFrame({"store_nbr": [1, 1, 1], "date": ["2016-03-01", "2016-01-01", "2016-02-01"]})
+    write_partitioned(lf, tmp_path / "out", ["store_nbr"], sort_by="date")
+
+    df = pl.read_parquet(tmp_path / "out" / "store_nbr=1")
+    assert df["date"].to_list() == ["2016-01-01", "2016-02-01", "2016-03-01"]
+
+
+def test_stratified_sample_is_native_and_reproducible():
+    from retaildata.processing.sampling import stratified_sample
+
+    df = pl.DataFrame({"item_id": ["a"] * 100 + ["b"] * 10, "v": range(110)})
+    sampled = stratified_sample(df, "item_id", 0.5, seed=7)
+
+    assert sampled["item_id"].value_counts(sort=True).rows() == [("a", 50), ("b", 5)]
+    assert sampled.equals(stratified_sample(df, "item_id", 0.5, seed=7))
+    assert not sampled.equals(stratified_sample(df, "item_id", 0.5, seed=8))
+
+    # LazyFrames stream: per-stratum thresholds keep floor(fraction * n) rows in expectation
+    big = pl.LazyFrame({"item_id": ["a"] * 10_000 + ["b"] * 2_000 + [None] * 1_000 + ["c"], "v": range(13_001)})
+    lazy = stratified_sample(big, "item_id", 0.5, seed=7).collect()
+    counts = dict(lazy["item_id"].value_counts().rows())
+    assert abs(counts["a"] - 5_000) < 250 and abs(counts["b"] - 1_000) < 100 and abs(counts[None] - 500) < 75
+    assert "c" not in counts
+    assert lazy.equals(stratified_sample(big, "item_id", 0.5, seed=7).collect())
+
+
+def test_hash_split_keeps_groups_together_and_is_seeded():
+    from retaildata.processing.sampling import hash_split
+
+    df = pl.DataFrame({"store_nbr": [i % 20 for i in range(2000)], "v": range(2000)})
+    train, test = hash_split(df, 0.8, seed=3, key=["store_nbr"])
+
+    assert len(train) + len(test) == 2000
+    assert set(train["store_nbr"]).isdisjoint(set(test["store_nbr"]))
+    again, _ = hash_split(df.lazy(), 0.8, seed=3, key=["store_nbr"])
+    assert again.collect().equals(train)
+
+
+@pytest.fixture
+def raw_duckdb(tmp_path):
+    duckdb = pytest.importorskip("duckdb")
+    pytest.importorskip("pyarrow")
+    raw_dir = tmp_path / "raw" / "retail_express"
+    raw_dir.mkdir(parents=True)
+    con = duckdb.connect(str(raw_dir / "retail_express.duckdb"))
+    con.execute("CREATE TABLE orders AS SELECT range AS id, range % 7 AS outlet FROM range(5000)")
+    con.execute("CREATE TABLE customers AS SELECT range AS id FROM range(10)")
+    con.execute("CREATE TABLE _dlt_loads AS SELECT 1 AS load_id")
+    con.close()
+    return tmp_path
+
+
+def test_duckdb_tables_are_exported_through_arrow(raw_duckdb):
+    results = ProcessingManager().prepare("retail_express", data_dir=raw_duckdb)
+    assert sorted(r.name for r in results) == ["retail_express.duckdb:customers", "retail_express.duckdb:orders"]
+
+    prepared = raw_duckdb / "prepared" / "retail_express"
+    assert pl.read_parquet(prepared / "orders.parquet").shape == (5000, 2)
+
+    from retaildata.processing import PrepareOptions
+    ProcessingManager().prepare("retail_express", data_dir=raw_duckdb, options=PrepareOptions(split_fraction=0.5))
+    assert len(pl.read_parquet(prepared / "orders_train.parquet")) + len(pl.read_parquet(prepared / "orders_test.parquet")) == 5000
+    assert not list(prepared.glob(".*staging*"))
+
+
+def test_duckdb_tasks_are_sized_per_table(raw_duckdb):
+    from retaildata.processing import PrepareOptions
+    from retaildata.processing.parallel import estimate_memory
+
+    raw_dir = raw_duckdb / "raw" / "retail_express"
+    tasks, _ = ProcessingManager()._collect_tasks("retail_express", raw_dir, raw_duckdb / "prepared", PrepareOptions())
+    estimates = {t.table: estimate_memory(t) for t in tasks}
+
+    assert sorted(estimates) == ["customers", "orders"]
+    assert 0 < estimates["customers"] < estimates["orders"]
+    # Tables are not each charged the size of the whole database file
+    assert sum(estimates.values()) < (raw_dir / "retail_express.duckdb").stat().st_size
+
+
+def test_load_reads_prepared_duckdb_via_arrow(raw_duckdb):
+    from retaildata.api import api
+
+    prepared = raw_duckdb / "prepared" / "retail_express"
+    prepared.mkdir(parents=True)
+    (raw_duckdb / "raw" / "retail_express" / "retail_express.duckdb").rename(prepared / "retail_express.duckdb")
+
+    data = api.load("retail_express", data_dir=raw_duckdb)
+    assert sorted(data) == ["customers", "orders"]
+    assert data["orders"].shape == (5000, 2)
+
+
+def test_lazy_duckdb_load_pushes_projection_and_filter(raw_duckdb, monkeypatch):
+    from retaildata.api import api
+    from retaildata.processing import duckdb_export
+
+    prepared = raw_duckdb / "prepared" / "retail_express"
+    prepared.mkdir(parents=True)
+    (raw_duckdb / "raw" / "retail_express" / "retail_express.duckdb").rename(prepared / "retail_express.duckdb")
+
+    queries = []
+    connect = duckdb_export._connect
+
+    def recording_connect(db_path):
+        con = connect(db_path)
+        original_execute = con.execute
+
+        class Recorder:
+            def execute(self, sql):
+                queries.append(sql)
+                return original_execute(sql)
+
+            def close(self):
+                con.close()
+
+        return Recorder()
+
+    monkeypatch.setattr(duckdb_export, "_connect", recording_connect)
+    orders = api.load("retail_express", data_dir=raw_duckdb, lazy=True)["orders"]
+    queries.clear()  # table listing happens at load time; reading must not
+
+    result = orders.filter(pl.col("outlet") == 3).select("id").collect()
+    assert len(result) == len([i for i in range(5000) if i % 7 == 3])
+    scan = queries[-1]
+    assert scan.startswith('SELECT "id"') and "WHERE" in scan and "outlet" in scan
+    assert orders.filter(pl.col("id").is_in([1, 8])).collect()["outlet"].to_list() == [1, 1]
+    assert 'WHERE ("id" IN (1, 8))' in queries[-1]
+    # The parts of an AND that DuckDB cannot take are applied by Polars
+    assert orders.filter((pl.col("id") < 20) & (pl.col("id") % 8 == 1)).collect()["outlet"].to_list() == [1, 2, 3]
+    assert queries[-1].endswith('WHERE ("id" < 20)')
+    assert orders.head(3).collect().height == 3
+
+
+def test_sql_predicate_translation():
+    import datetime
+    from retaildata.processing.duckdb_export import _sql_predicate
+
+    # Fails loudly if a Polars release changes the serialized expression tree
+    assert _sql_predicate((pl.col("a") > 1) & (pl.col("b") == "it's")) == ("""("a" > 1) AND ("b" = 'it''s')""", True)
+    assert _sql_predicate(~pl.col("a").is_not_null() | (pl.col("c") <= 2.5)) == ('((NOT ("a" IS NOT NULL)) OR ("c" <= 2.5))', True)
+    assert _sql_predicate((pl.col("a") != pl.col("b")) | (pl.col("flag") == True)) == ('(("a" <> "b") OR ("flag" = TRUE))', True)  # noqa: E712
+    assert _sql_predicate(pl.col("d").is_between(datetime.date(2020, 1, 1), pl.date(2020, 3, 1), closed="left")) == (
+        """(("d" >= DATE '2020-01-01') AND ("d" < DATE '2020-03-01'))""", True
+    )
+    assert _sql_predicate(pl.col("t") < datetime.datetime(2020, 1, 2, 3, 4, 5)) == ("""("t" < TIMESTAMP '2020-01-02 03:04:05')""", True)
+    assert _sql_predicate(pl.col("a").is_in([1, 2, None])) == ('("a" IN (1, 2))', True)
+    # The translatable side of an AND is pushed down; Polars re-applies the whole predicate
+    assert _sql_predicate((pl.col("a") < 80) & (pl.col("a") % 7 == 0)) == ('("a" < 80)', False)
+    # Untranslatable predicates are left to Polars
+    assert _sql_predicate(pl.col("a") & pl.col("b")) == (None, False)
+    assert _sql_predicate(pl.col("a") == float("nan")) == (None, False)
+
+
+def test_excel_workbooks_prepare_every_sheet_and_cache_parses(tmp_path, monkeypatch):
+    xlsxwriter = pytest.importorskip("xlsxwriter")
+    pytest.importorskip("fastexcel")
+    from retaildata.config import settings
+    from retaildata.processing import excel
+
+    monkeypatch.setattr(settings, "cache_dir", tmp_path / "cache")
+    raw_dir = tmp_path / "raw" / "superstore"
+    raw_dir.mkdir(parents=True)
+    with xlsxwriter.Workbook(raw_dir / "Superstore.xlsx") as wb:
+        pl.DataFrame({"order": [1, 2], "sales": [1.5, 2.5]}).write_excel(wb, worksheet="Orders")
+        pl.DataFrame({"person": ["A"], "region": ["West"]}).write_excel(wb, worksheet="People 2024")
+
+    results = ProcessingManager().prepare("superstore", data_dir=tmp_path)
+    assert results[0].outputs == ["Superstore_Orders.parquet", "Superstore_People_2024.parquet"]
+
+    # A second read (e.g. from `inspect`) is served from the parse cache
+    monkeypatch.setattr(excel, "_read_sheet", lambda *a: pytest.fail("workbook parsed twice"))
+    sheets = excel.read_workbook(raw_dir / "Superstore.xlsx")
+    assert sheets["Orders"]["sales"].to_list() == [1.5, 2.5]
+
+
+def test_excel_sheet_names_that_collide_get_suffixes():
+    from retaildata.processing.excel import table_names
+
+    assert table_names("Book", ["Sales"]) == {"Sales": "Book"}
+    assert table_names("Book", ["Q1 Sales", "Q1-Sales", "Q1_Sales", "***"]) == {
+        "Q1 Sales": "Book_Q1_Sales", "Q1-Sales": "Book_Q1_Sales_2", "Q1_Sales": "Book_Q1_Sales_3", "***": "Book_sheet",
+    }
+
+
+def test_compaction_shrinks_dtypes_and_load_restores_them(tmp_path):
+    from retaildata.api import api
+
+    raw_dir = tmp_path / "raw" / "m5"
+    raw_dir.mkdir(parents=True)
+    pl.DataFrame({
+        "item_id": [f"item_{i % 30}" for i in range(600)],
+        "description": [f"unique text {i}" for i in range(600)],
+        "units": [i % 100 for i in range(600)],
+        "price": [0.5 * (i % 8) for i in range(600)],
+    }).write_csv(raw_dir / "sales.csv")
+
+    ProcessingManager().process_dataset("m5", data_dir=tmp_path, compact=True, split_fraction=0.7)
+
+    data = api.load("m5", data_dir=tmp_path)
+    train, test = data["sales_train"], data["sales_test"]
+    assert isinstance(train.schema["item_id"], pl.Enum)
+    assert train.schema["item_id"] == test.schema["item_id"]
+    assert train.schema["description"] == pl.String
+    assert train.schema["units"] == pl.Int8
+    assert train.schema["price"] == pl.Float32
+    assert pl.concat([train, test])["units"].sum() == sum(i % 100 for i in range(600))
+
+
+def test_inferred_csv_schema_is_persisted_and_reused(raw_csv, monkeypatch):
+    from retaildata.processing import schema
+
+    ProcessingManager().prepare("bank_marketing_uci", data_dir=raw_csv)
+    cached = list((raw_csv / "meta" / "bank_marketing_uci" / "schemas").glob("*.json"))
+    assert len(cached) == 1
+
+    # A forced re-prepare reads the persisted schema instead of inferring again
+    monkeypatch.setattr(schema.pl, "scan_csv", lambda *a, **k: pytest.fail("schema inferred twice"))
+    results = ProcessingManager().prepare("bank_marketing_uci", data_dir=raw_csv, force=True)
+    assert results[0].ok
+
+
+def test_parse_dtype_understands_parametrized_types():
+    from retaildata.processing.schema import parse_dtype
+
+    assert parse_dtype("Int8") == pl.Int8
+    assert parse_dtype("Categorical") == pl.Categorical
+    assert parse_dtype("Datetime[ms, UTC]") == pl.Datetime("ms", "UTC")
+    assert parse_dtype(str(pl.Datetime("ns", "Europe/Berlin"))) == pl.Datetime("ns", "Europe/Berlin")
+    assert parse_dtype("Decimal(10, 2)") == pl.Decimal(10, 2)
+    assert parse_dtype("Nonsense", default=pl.String) == pl.String
+    with pytest.raises(ValueError):
+        parse_dtype("Nonsense")
+
+
+def test_load_selects_tables_columns_and_rows(tmp_path, monkeypatch):
+    import datetime
+    from retaildata.api import load
+
+    prepared = tmp_path / "prepared" / "m5"
+    prepared.mkdir(parents=True)
+    pl.DataFrame({
+        "date": [datetime.date(2015, 1, 1) + datetime.timedelta(days=i) for i in range(100)],
+        "item_id": ["a", "b"] * 50,
+        "sales": list(range(100)),
+    }).write_parquet(prepared / "sales_train_evaluation.parquet")
+    pl.DataFrame({"date": [datetime.date(2015, 1, 1)], "event": ["x"]}).write_parquet(prepared / "calendar.parquet")
+
+    data = load(
+        "m5", data_dir=tmp_path, standardized=True, tables=["sales"], columns=["date", "sales"],
+        filters=pl.col("date").is_between(datetime.date(2015, 2, 1), datetime.date(2015, 2, 28)),
+    )
+    assert list(data) == ["sales"]
+    assert data["sales"].columns == ["date", "sales"]
+    assert data["sales"]["sales"].to_list() == list(range(31, 59))
+
+    # Filters only apply to tables that have the referenced columns
+    both = load("m5", data_dir=tmp_path, lazy=True, filters=[pl.col("item_id") == "a", pl.col("sales") < 10])
+    assert both["sales_train_evaluation"].collect().height == 5
+    assert both["calendar"].collect().height == 1
+
+    with pytest.raises(KeyError):
+        load("m5", data_dir=tmp_path, tables=["prices"], standardized=True)
+
+    # DuckDB-backed datasets get the same projection and date window pushed into the scan
+    duckdb = pytest.importorskip("duckdb")
+    pytest.importorskip("pyarrow")
+    from retaildata.processing import duckdb_export
+
+    prepared = tmp_path / "prepared" / "retail_express"
+    prepared.mkdir(parents=True)
+    con = duckdb.connect(str(prepared / "retail_express.duckdb"))
+    con.execute("CREATE TABLE orders AS SELECT range AS id, DATE '2015-01-01' + range::INTEGER AS date FROM range(100)")
+    con.close()
+
+    clauses = []
+    translate = duckdb_export._sql_predicate
+    monkeypatch.setattr(duckdb_export, "_sql_predicate", lambda p: clauses.append(translate(p)) or clauses[-1])
+
+    data = load(
+        "retail_express", data_dir=tmp_path, tables=["orders"], columns=["id"],
+        filters=pl.col("date").is_between(datetime.date(2015, 2, 1), datetime.date(2015, 2, 28)),
+    )
+    assert data["orders"].columns == ["id"]
+    assert data["orders"]["id"].to_list() == list(range(31, 59))
+    # The whole window became the WHERE clause, so nothing was left for Polars to filter
+    assert clauses == [("""(("date" >= DATE '2015-02-01') AND ("date" <= DATE '2015-02-28'))""", True)]
+
+
+def test_load_cache_serves_repeats_and_invalidates_on_change(tmp_path):
+    import os
+    from retaildata.api import load
+    from retaildata.cache.memory import LoadCache, load_cache
+
+    prepared = tmp_path / "prepared" / "m5"
+    prepared.mkdir(parents=True)
+    pl.DataFrame({"a": [1, 2, 3]}).write_parquet(prepared / "calendar.parquet")
+    load_cache.clear()
+    before = load_cache.stats()
+
+    first = load("m5", data_dir=tmp_path, cache=True)["calendar"]
+    again = load("m5", data_dir=tmp_path, cache=True)["calendar"]
+    assert again.equals(first)
+    assert load_cache.stats()["hits"] == before["hits"] + 1
+    assert load_cache.stats()["misses"] == before["misses"] + 1
+
+    # Rewriting the prepared file invalidates the entry
+    pl.DataFrame({"a": [4, 5]}).write_parquet(prepared / "calendar.parquet")
+    os.utime(prepared / "calendar.parquet", ns=(1, 1))
+    assert load("m5", data_dir=tmp_path, cache=True)["calendar"]["a"].to_list() == [4, 5]
+
+    # Filters with Python UDFs cannot be keyed, so those loads bypass the cache
+    udf = pl.col("a").map_elements(lambda v: hash(v) == hash(5), return_dtype=pl.Boolean)
+    entries = load_cache.stats()["entries"]
+    assert load("m5", data_dir=tmp_path, cache=True, filters=udf)["calendar"]["a"].to_list() == [5]
+    assert load_cache.stats()["entries"] == entries
+
+    # Eager DuckDB tables are read straight into DataFrames and cached the same way
+    duckdb = pytest.importorskip("duckdb")
+    express = tmp_path / "prepared" / "retail_express"
+    express.mkdir(parents=True)
+    con = duckdb.connect(str(express / "retail_express.duckdb"))
+    con.execute("CREATE TABLE orders AS SELECT range AS id FROM range(10)")
+    con.execute("CREATE TABLE customers AS SELECT range AS id FROM range(3)")
+    con.close()
+    load_cache.clear()
+    before = load_cache.stats()
+    for _ in range(3):
+        tables = load("retail_express", data_dir=tmp_path, cache=True)
+        assert tables["orders"].height == 10 and tables["customers"].height == 3
+    stats = load_cache.stats()
+    assert stats["entries"] == 2
+    assert stats["misses"] == before["misses"] + 2
+    assert stats["hits"] == before["hits"] + 4
+    load_cache.clear()
+
+    small = LoadCache(max_bytes=100)
+    key_a, key_b = ("m5", "a"), ("m5", "b")
+    small.put(key_a, (), pl.DataFrame({"x": list(range(8))}))
+    small.put(key_b, (), pl.DataFrame({"x": list(range(8))}))
+    assert small.get(key_a, ()) is None and small.get(key_b, ()) is not None
+    assert small.stats()["evictions"] == 1
+
+
+@pytest.mark.parametrize("compression", ["uncompressed", "lz4"])
+def test_ipc_prepared_format_is_loaded_memory_mapped(raw_csv, compression):
+    from retaildata.api import api
+
+    manager = ProcessingManager()
+    manager.process_dataset("bank_marketing_uci", data_dir=raw_csv, prepared_format="both", ipc_compression=compression, split_fraction=0.8)
+    prepared = raw_csv / "prepared" / "bank_marketing_uci"
+    assert sorted(p.name for p in prepared.iterdir()) == [
+        "data_test.arrow", "data_test.parquet", "data_train.arrow", "data_train.parquet"
+    ]
+
+    data = api.load("bank_marketing_uci", data_dir=raw_csv)
+    assert sorted(data) == ["data_test", "data_train"]
+    assert data["data_train"].equals(pl.read_parquet(prepared / "data_train.parquet"))
+
+    # Switching to IPC only removes the Parquet copies on the next prepare
+    manager.process_dataset("bank_marketing_uci", data_dir=raw_csv, prepared_format="ipc", ipc_compression=compression, split_fraction=0.8)
+    assert sorted(p.suffix for p in prepared.iterdir()) == [".arrow", ".arrow"]
+    assert len(api.load("bank_marketing_uci", data_dir=raw_csv, lazy=True)["data_test"].collect()) > 0
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_split_temporal_handles_many_cutoffs_in_one_scan(tmp_path, lazy):
+    from retaildata.api import api
+
+    prepared = tmp_path / "prepared" / "m5"
+    prepared.mkdir(parents=True)
+    pl.DataFrame({
+        "date": [f"2011-01-{day:02d}" for day in range(31, 0, -1)] + [None],
+        "sales": list(range(32)),
+    }).write_parquet(prepared / "sales_train_evaluation.parquet")
+    pl.DataFrame({"x": [1]}).write_parquet(prepared / "calendar.parquet")
+
+    single = api.split_temporal("m5", date_col="date", split_date="2011-01-11", data_dir=tmp_path, lazy=lazy)
+    train = single["train"].collect() if lazy else single["train"]
+    assert len(train) == 10 and train["date"].dtype == pl.Datetime
+
+    splits = api.split_temporal("m5", date_col="date", split_date=["2011-01-05", "2011-01-20"], data_dir=tmp_path, lazy=lazy)
+    for cutoff, n_train in [("2011-01-05", 4), ("2011-01-20", 19)]:
+        pair = splits[cutoff]
+        if lazy:
+            pair = {side: frame.collect() for side, frame in pair.items()}
+        assert len(pair["train"]) == n_train
+        assert len(pair["test"]) == 31 - n_train
+        assert pair["train"]["date"].max() < pair["test"]["date"].min()
+
+
+def test_backtest_folds_are_slices_of_one_sorted_scan():
+    import datetime
+    from retaildata.utils.temporal import backtest_folds
+
+    days = [datetime.date(2020, 1, 1) + datetime.timedelta(days=i) for i in range(20)]
+    df = pl.DataFrame({"date": days[::-1] * 2, "store": ["a"] * 20 + ["b"] * 20, "y": list(range(40))})
+
+    folds = backtest_folds(df, "date", horizon=3, n_folds=3, gap=1)
+    assert [f.origin for f in folds] == [days[11], days[14], days[17]]
+    assert [len(f.test_rows) for f in folds] == [6, 6, 6]
+    train, test = folds[-1]
+    assert train["date"].max() == days[15] and test["date"].min() == days[17]
+
+    sliding = backtest_folds(df.lazy(), "date", horizon=2, n_folds=2, window="sliding", train_size=5)
+    train, test = sliding[0]
+    assert isinstance(train, pl.LazyFrame)
+    assert train.collect()["date"].n_unique() == 5 and test.collect()["date"].max() == days[17]
+
+    # Panels: every series is backtested on its own last periods
+    ragged = df.filter((pl.col("store") == "a") | (pl.col("date") <= days[9]))
+    last_fold = backtest_folds(ragged, "date", horizon=2, n_folds=2, series_col="store")[-1]
+    firsts = last_fold.test.group_by("store").agg(pl.col("date").min()).sort("store")["date"].to_list()
+    assert firsts == [days[18], days[8]]
+
+    with pytest.raises(ValueError):
+        backtest_folds(df, "date", horizon=10, n_folds=3)
+
+
+def test_query_exposes_every_prepared_table_as_dataset_views(raw_duckdb, monkeypatch):
+    import duckdb
+    import retaildata
+    from typer.testing import CliRunner
+    from retaildata.cli import app
+    from retaildata.processing.partition import write_partitioned
+
+    shop = raw_duckdb / "prepared" / "retail_express"
+    shop.mkdir(parents=True)
+    (raw_duckdb / "raw" / "retail_express" / "retail_express.duckdb").rename(shop / "retail_express.duckdb")
+    stores = raw_duckdb / "prepared" / "store_sales"
+    stores.mkdir(parents=True)
+    pl.DataFrame({"outlet": list(range(7)), "city": ["A", "B"] * 3 + ["C"]}).write_ipc(stores / "stores.arrow")
+    pl.DataFrame({"outlet": [0, 1], "units": [5, 6]}).write_parquet(stores / "sales.parquet")
+    write_partitioned(pl.DataFrame({"outlet": [0, 0, 1], "day": [1, 2, 1]}), stores / "visits", ["outlet"], None, True)
+
+    result = retaildata.query(
+        "SELECT s.city, count(*) AS n FROM retail_express.orders o "
+        "JOIN store_sales.stores s USING (outlet) GROUP BY 1 ORDER BY 1",
+        data_dir=raw_duckdb,
+    )
+    assert isinstance(result, pl.DataFrame)
+    assert result["n"].sum() == 5000 and result["city"].to_list() == ["A", "B", "C"]
+
+    from retaildata.processing import catalog
+    connections = []
+    connect = catalog.connect
+    monkeypatch.setattr(catalog, "connect", lambda *a: connections.append(connect(*a)) or connections[-1])
+
+    reader = retaildata.query("SELECT * FROM store_sales.visits WHERE outlet = 0", data_dir=raw_duckdb, arrow=True)
+    assert reader.read_all().num_rows == 2
+    # The connection is closed once the reader is exhausted, and when the SQL fails
+    with pytest.raises(duckdb.ConnectionException):
+        connections[-1].execute("SELECT 1")
+    with pytest.raises(duckdb.CatalogException):
+        retaildata.query("SELECT * FROM store_sales.missing", data_dir=raw_duckdb)
+    with pytest.raises(duckdb.ConnectionException):
+        connections[-1].execute("SELECT 1")
+    assert retaildata.query("SELECT sum(units) AS u FROM store_sales.sales", data_dir=raw_duckdb)["u"][0] == 11
+
+    out = CliRunner().invoke(app, ["sql", "SELECT count(*) AS n FROM retail_express.customers", "--output", str(raw_duckdb)])
+    assert out.exit_code == 0 and "10" in out.output
@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["polars", "duckdb", "pyarrow", "httpx", "kaggle", "huggingface_hub", "ucimlrepo", "openml", "dlt"]
+
+# Generous wall-clock budget for a cold `import retaildata.cli` plus two metadata commands
+STARTUP_BUDGET_SECONDS = 2.0
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from typer.testing import CliRunner
+from retaildata.cli import app
+imported = time.perf_counter() - start
+runner = CliRunner()
+codes = [runner.invoke(app, ["list"]).exit_code, runner.invoke(app, ["info", "m5"]).exit_code]
+print(json.dumps({
+    "import_seconds": imported,
+    "total_seconds": time.perf_counter() - start,
+    "exit_codes": codes,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def test_metadata_commands_skip_heavy_imports():
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["exit_codes"] == [0, 0]
+    assert result["loaded"] == []
+    assert result["total_seconds"] < STARTUP_BUDGET_SECONDS, result
+
+
+def test_registry_validates_entries_on_access():
+    from retaildata.datasets.registry import Dataset, Registry
+
+    ids = Registry.ids()
+    assert "m5" in ids and len(ids) == len(set(ids))
+    dataset = Registry.get("m5")
+    assert isinstance(dataset, Dataset) and Registry.get("m5") is dataset
+    assert Registry.get("not_a_dataset") is None
+
+
+def test_prepare_worker_initializer_skips_heavy_imports():
+    # Spawned prepare workers import the initializer's module before polars may load
+    probe = "import sys, retaildata.processing.parallel; print([m for m in %r if m in sys.modules])" % (HEAVY_MODULES,)
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -47,7 +47,7 @@ def test_dlt_integration():
         mock_instance = mock_conn.return_value
         mock_instance.execute.return_value.fetchall.return_value = [("customers",), ("orders",)]
         
-        with patch("polars.read_database", return_value=mock_df):
+        with patch("retaildata.processing.duckdb_export.read_table", return_value=mock_df):
             data = api.load(dataset_id, data_dir=output_dir)
             
             print(f"Loaded tables: {list(data.keys())}")